@@ -0,0 +1,190 @@
+"""Benchmarks of the analysis, simulation and portfolio hot paths on seeded synthetic data.
+
+Every benchmark runs on a synthetic_panel of each ticker count and history length, so results
+are reproducible offline. Wall time is the best of several repeats; peak memory is measured by
+tracemalloc in a separate run so it does not slow the timed ones.
+
+    python benchmarks/bench.py --tickers 50 500 5000 --years 1 5 20 --output bench.json
+    python benchmarks/bench.py --baseline bench.json --output bench_new.json --threshold 1.25
+
+With --baseline, benchmarks more than "threshold" times slower than the baseline are listed
+and the exit status is 1.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pytrade
+from pytrade import analysis_1
+from pytrade.cache import analysis_cache, state_cache
+
+
+def analysis_run(panel, days):
+    ratios = pytrade.calculate_ratio(panel["Adj Close"])
+    analysis_date = panel.index[-1].date()
+    return lambda: analysis_1.run(ratios, analysis_date)
+
+def strategy_prepare(panel, days):
+    strategy = pytrade.Utkarsh_v1_short_base("bench")
+    version = pytrade.data_version(panel)
+
+    def run():
+        state_cache.clear()
+        strategy.prepare(panel, version)
+    return run
+
+def strategy_analysis(panel, days):
+    strategy = pytrade.Utkarsh_v1_short_base("bench")
+    strategy.prepare(panel)
+    adj_close = panel["Adj Close"]
+    analysis_date = panel.index[-1].date()
+
+    def run():
+        analysis_cache.clear()
+        strategy.analysis(adj_close, analysis_date)
+    return run
+
+def simulation_run(panel, days):
+    version = pytrade.data_version(panel)
+    start = panel.index[-days].date()
+    end = panel.index[-1].date()
+
+    def run():
+        analysis_cache.clear()
+        simulation = pytrade.Simulation(panel, 10000, pytrade.Utkarsh_v1_short_base("bench"), start, end,
+                                        name="bench", verbose=False, version=version)
+        simulation._portfolio.logging = False
+        simulation.run()
+    return run
+
+def _portfolio(panel):
+    portfolio = pytrade.Portfolio("bench", panel)
+    portfolio.logging = False
+    portfolio.deposit(1e9, panel.index[-1].date())
+    return portfolio
+
+def portfolio_buy_sell(panel, days):
+    tickers = list(panel["Adj Close"].columns[:-1])[:200]
+    prices = panel["Adj Close"].iloc[-1]
+    trade_date = panel.index[-1].date()
+
+    def run():
+        portfolio = _portfolio(panel)
+        for ticker in tickers:
+            portfolio.buy(ticker, 10, 10 * prices[ticker], trade_date)
+        for ticker in tickers:
+            portfolio.sell(ticker, 5, 5 * prices[ticker], trade_date)
+    return run
+
+def portfolio_current_value(panel, days):
+    portfolio = _portfolio(panel)
+    prices = panel["Adj Close"].iloc[-1]
+    trade_date = panel.index[-1].date()
+    for ticker in list(panel["Adj Close"].columns[:-1])[:200]:
+        portfolio.buy(ticker, 10, 10 * prices[ticker], trade_date)
+
+    def run():
+        for _ in range(100):
+            portfolio.current_value()
+    return run
+
+BENCHMARKS = {
+    "analysis_1.run": analysis_run,
+    "Strategy.prepare": strategy_prepare,
+    "Strategy.analysis": strategy_analysis,
+    "Simulation.run": simulation_run,
+    "Portfolio.buy/sell": portfolio_buy_sell,
+    "Portfolio.current_value": portfolio_current_value,
+}
+
+
+def measure(run, repeats):
+    """Best and mean wall time over "repeats" calls, and the peak traced allocation of one more call."""
+    run() # Warm up imports and lazily built state
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"best_seconds": min(times), "mean_seconds": sum(times) / len(times), "repeats": repeats, "peak_bytes": peak}
+
+def run_suite(tickers, years, names, repeats, days, seed):
+    results = []
+    for n in tickers:
+        for y in years:
+            panel = pytrade.synthetic_panel(n, y, seed)
+            for name in names:
+                row = {"benchmark": name, "tickers": n, "years": y}
+                row.update(measure(BENCHMARKS[name](panel, days), repeats))
+                results.append(row)
+                print(f"{name:<25} tickers={n:<5} years={y:<3} best={row['best_seconds']:.4f}s "
+                      f"peak={row['peak_bytes'] / 2**20:.1f}MiB", flush=True)
+    return results
+
+def regressions(results, baseline, threshold):
+    """Benchmarks whose best time exceeds "threshold" times the baseline's."""
+    before = {(r["benchmark"], r["tickers"], r["years"]): r["best_seconds"] for r in baseline["results"]}
+    slower = []
+    for r in results:
+        key = (r["benchmark"], r["tickers"], r["years"])
+        if key in before and r["best_seconds"] > threshold * before[key]:
+            slower.append((key, before[key], r["best_seconds"]))
+    return slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--years", type=float, nargs="+", default=[1, 5])
+    parser.add_argument("--benchmarks", nargs="+", default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--days", type=int, default=20, help="trading days simulated by Simulation.run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench.json")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    # Read the baseline before anything is written, it may be an earlier run's --output
+    baseline = None
+    if args.baseline:
+        if os.path.abspath(args.baseline) == os.path.abspath(args.output):
+            parser.error("--baseline and --output are the same file, pass a different --output")
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = run_suite(args.tickers, args.years, args.benchmarks, args.repeats, args.days, args.seed)
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+
+    if baseline is not None:
+        slower = regressions(results, baseline, args.threshold)
+        for (name, n, y), before, after in slower:
+            print(f"REGRESSION {name} tickers={n} years={y}: {before:.4f}s -> {after:.4f}s")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
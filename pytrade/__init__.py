@@ -1,6 +1,14 @@
 from .data import *
 
 from . import analysis_1
+from .extrema import *
+from .cube import *
+from .cache import *
+from .trading_calendar import *
+from .context import *
+from .streaming import *
+from .corporate_actions import *
+from .profiler import *
 
 from .portfolio import *
 from .simulation import *
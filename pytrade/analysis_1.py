@@ -1,22 +1,96 @@
 import pandas as pd
 import datetime
 import numpy as np
+from .data import calculate_ratio
+from .extrema import WINDOWS
+from .trading_calendar import TradingCalendar
 
-def run(ratios, analysis_date=datetime.date.today()):
-    three_wk_mask = analysis_date-ratios.index.date <= datetime.timedelta(days=21)
-    three_m_mask = analysis_date-ratios.index.date <= datetime.timedelta(days=91)
-    one_yr_mask = analysis_date-ratios.index.date <= datetime.timedelta(days=365)
-    #st_multiplier = 2
+def window_frame(ratios, analysis_date, windows):
+    """Latest ratio and the high/low of each window, computed directly from "ratios".
 
-    # Format Analysis
+    Args:
+        ratios (DataFrame): Ratios up to the analysis date.
+        analysis_date (date): Date the windows are measured back from.
+        windows (list): Window names from extrema.WINDOWS.
+
+    Returns:
+        DataFrame: "latest" and "<window>_high"/"<window>_low" columns indexed by ticker.
+    """
     analysis = pd.DataFrame(ratios.iloc[-1])
     analysis.rename({analysis.columns[0]:"latest"}, axis = 1, inplace = True) # Better way to do this?
-    analysis["three_wk_high"] = pd.DataFrame(ratios[three_wk_mask].max())
-    analysis["three_wk_low"] = pd.DataFrame(ratios[three_wk_mask].min())
-    analysis["three_m_high"] = pd.DataFrame(ratios[three_m_mask].max())
-    analysis["three_m_low"] = pd.DataFrame(ratios[three_m_mask].min())
-    analysis["one_yr_high"] = pd.DataFrame(ratios[one_yr_mask].max())
-    analysis["one_yr_low"] = pd.DataFrame(ratios[one_yr_mask].min())
+    calendar = TradingCalendar(ratios.index)
+    for name in windows:
+        window = ratios.iloc[calendar.window_start(analysis_date, WINDOWS[name]):]
+        analysis[f"{name}_high"] = pd.DataFrame(window.max())
+        analysis[f"{name}_low"] = pd.DataFrame(window.min())
+    return analysis
+
+def stochastic_metrics(latest, short_high, short_low, long_high, long_low):
+    """Stochastic ranges, difference and potential (analysis 1.1.1). Works elementwise on Series or arrays.
+
+    Returns:
+        tuple: (short range, long range, stochastic difference, potential).
+    """
+    short_range = (latest - short_low) / ((short_high - short_low))
+    long_range = (latest - long_low) / ((long_high - long_low))
+    stochastic_difference = long_range - short_range
+
+    equilibrium = (short_low * long_high - long_low * short_high) / \
+        (long_high - short_high + short_low - long_low)
+    potential = equilibrium / latest - 1
+    return short_range, long_range, stochastic_difference, potential
+
+def stochastic_metric(stochastic_difference, potential):
+    """Metric of analysis 1.1.1: the stochastic difference plus the potential scaled by the smallest
+    multiplier across tickers. The last axis of an array input is the ticker axis.
+    """
+    multiplier = np.fmin.reduce(np.abs((1 - np.asarray(stochastic_difference)) / np.asarray(potential)), axis=-1)
+    if np.ndim(multiplier) > 0:
+        multiplier = multiplier[..., None]
+    return stochastic_difference + potential * multiplier
+
+def stochastic(adj_close_df, analysis_date, short, long, extrema=None, cube=None):
+    """Stochastic difference, potential and metric of a short window against a long window (analysis 1.1.1).
+
+    Args:
+        adj_close_df (DataFrame): Adjusted close prices up to the analysis date.
+        analysis_date (date): Date of the analysis.
+        short (str): Short window name, e.g. "three_wk".
+        long (str): Long window name, e.g. "one_yr".
+        extrema (RollingExtrema, optional): Precomputed window highs/lows covering "adj_close_df". Defaults to None.
+        cube (AnalysisCube, optional): Precomputed analysis of every date for this window pair. Defaults to None.
+
+    Returns:
+        DataFrame: Analysis indexed by ticker, with a "metric" column to rank on.
+    """
+    if cube is not None and cube.extrema.covers(adj_close_df):
+        analysis = cube.frame(analysis_date, row=len(adj_close_df.index) - 1)
+        if analysis is not None:
+            return analysis
+
+    if extrema is not None and extrema.covers(adj_close_df):
+        analysis = extrema.frame(analysis_date, [short, long], row=len(adj_close_df.index) - 1)
+    else:
+        analysis = window_frame(calculate_ratio(adj_close_df), analysis_date, [short, long])
+
+    short_range, long_range, stochastic_difference, potential = stochastic_metrics(analysis["latest"],
+        analysis[f"{short}_high"], analysis[f"{short}_low"], analysis[f"{long}_high"], analysis[f"{long}_low"])
+    analysis[f"{short}_range"] = short_range
+    analysis[f"{long}_range"] = long_range
+    analysis["stochastic_difference"] = stochastic_difference
+    analysis["potential"] = potential
+    analysis["metric"] = stochastic_metric(stochastic_difference, potential)
+    return analysis
+
+def run(ratios, analysis_date=datetime.date.today(), extrema=None):
+    #st_multiplier = 2
+
+    # Format Analysis
+    windows = ["three_wk", "three_m", "one_yr"]
+    if extrema is not None and extrema.covers(ratios):
+        analysis = extrema.frame(analysis_date, windows, row=len(ratios.index) - 1)
+    else:
+        analysis = window_frame(ratios, analysis_date, windows)
 
     # Better way to do this?
     analysis["three_wk_range"] = (analysis["latest"] - analysis["three_wk_low"]) / ((analysis["three_wk_high"] - analysis["three_wk_low"]))
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+
+def sizeof(value):
+    """Bytes held by a cached value: its nbytes (arrays, RollingExtrema, AnalysisCube) or DataFrame memory, else 0."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    return int(getattr(value, "nbytes", 0))
+
+
+class AnalysisCache:
+    """Process-wide LRU cache for analysis results, with hit/miss counters.
+
+    Entries are evicted, least recently used first, when there are more than "maxsize" of them
+    or they hold more than "maxbytes" together (see sizeof). The newest entry is always kept.
+    """
+    def __init__(self, maxsize=4096, maxbytes=None):
+        """Cache initializer.
+
+        Args:
+            maxsize (int, optional): Entries kept before the least recently used one is evicted. Defaults to 4096.
+            maxbytes (int, optional): Bytes kept before the least recently used entry is evicted. Defaults to no limit.
+        """
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Returns the cached value for "key", calling "compute" to fill it on a miss.
+
+        Args:
+            key (hashable): Cache key, e.g. (data version, analysis date, window spec).
+            compute (function): Called without arguments to produce the value on a miss.
+
+        Returns:
+            object: Cached or freshly computed value.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = value
+            self._sizes[key] = sizeof(value)
+            self.nbytes += self._sizes[key]
+            while len(self._entries) > 1 and (len(self._entries) > self.maxsize or
+                                              (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+                self._drop(next(iter(self._entries)))
+        return value
+
+    def _drop(self, key):
+        if key in self._entries:
+            del self._entries[key]
+            self.nbytes -= self._sizes.pop(key)
+
+    def discard(self, version):
+        """Evicts every entry of a data version, the first element of the keys."""
+        with self._lock:
+            for key in [key for key in self._entries if isinstance(key, tuple) and key and key[0] == version]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Cache statistics.
+
+        Returns:
+            dict: hits, misses, current size and bytes, maxsize and maxbytes.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize,
+                "nbytes": self.nbytes, "maxbytes": self.maxbytes}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Per-day analysis frames, keyed by (data version, rows, analysis date, windows)
+analysis_cache = AnalysisCache(maxbytes=256 * 2**20)
+# Full-history precomputation (RollingExtrema, AnalysisCube), keyed by (data version, kind)
+state_cache = AnalysisCache(maxsize=16, maxbytes=1024 * 2**20)
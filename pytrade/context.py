@@ -0,0 +1,188 @@
+import weakref
+import numpy as np
+from .data import data_version, PricePanel
+from .profiler import profiled
+from .trading_calendar import TradingCalendar, to_day
+
+
+class Context:
+    """As-of view of a price data set: the rows up to a current position, without copying them.
+
+    A simulation advances the end pointer one trading day at a time. Every lookup is limited to
+    rows at or before the current position, so nothing can look ahead of the simulated date.
+    The view supports the DataFrame lookups the strategies use ("context[field]" and
+    "context.index") as well as direct price lookups for the portfolio.
+    """
+    profiler = None # Profiler timing the lookups, see pytrade.profiler
+
+    def __init__(self, data, end=None, calendar=None, version=None):
+        """Context initializer.
+
+        Args:
+            data (DataFrame or PricePanel): Full data set with (field, ticker) MultiIndex columns. The lookups
+                of a panel read its array, memory mapped or not, without copying it.
+            end (int, optional): Number of visible rows. Defaults to all rows.
+            calendar (TradingCalendar, optional): Calendar of "data". Defaults to a new one.
+            version (str, optional): data_version of "data", if already known. Defaults to None.
+        """
+        self.data = data
+        self._version = version
+        self.calendar = TradingCalendar(data.index) if calendar is None else calendar
+        self.end = len(data.index) if end is None else end
+        self._frames = {}
+        self._values = {}
+        self._columns = {}
+        fields = data.fields if isinstance(data, PricePanel) else dict.fromkeys(data.columns.get_level_values(0))
+        for field in fields:
+            frame = data[field]
+            self._frames[field] = frame
+            self._values[field] = frame.to_numpy()
+            self._columns[field] = {ticker: j for j, ticker in enumerate(frame.columns)}
+
+    @property
+    def position(self):
+        """Row of the current date."""
+        return self.end - 1
+
+    @property
+    def version(self):
+        """data_version of the full data set, computed on first use."""
+        if self.__dict__.get("_version") is None:
+            self._version = data_version(self.data)
+        return self._version
+
+    @property
+    def index(self):
+        return self.data.index[:self.end]
+
+    @property
+    def date(self):
+        return self.data.index[self.end - 1]
+
+    def __len__(self):
+        return self.end
+
+    @profiled
+    def __getitem__(self, field):
+        return self._frames[field].iloc[:self.end]
+
+    @profiled
+    def seek(self, position):
+        """Moves the current date to row "position".
+
+        Args:
+            position (int): Row of the new current date.
+        """
+        if position < 0 or position >= len(self.calendar):
+            raise IndexError(f"Position {position} outside of the data set")
+        self.end = position + 1
+
+    def advance(self, rows=1):
+        """Moves the current date forward by "rows" trading days."""
+        self.seek(self.end - 1 + rows)
+
+    def as_of(self, position):
+        """New view of the same data ending at row "position"."""
+        context = Context.__new__(Context)
+        context.__dict__.update(self.__dict__)
+        context.seek(position)
+        return context
+
+    def latest(self, ticker, field="Adj Close"):
+        """Price of "ticker" on the current date.
+
+        Args:
+            ticker (str): Stock identifier.
+            field (str, optional): Price field. Defaults to "Adj Close".
+
+        Returns:
+            number: Latest price.
+        """
+        return self._values[field][self.end - 1, self._columns[field][ticker]]
+
+    def latest_row(self, field="Adj Close"):
+        """Prices of every ticker on the current date, in column order."""
+        return self._values[field][self.end - 1]
+
+    def has(self, ticker, field="Adj Close"):
+        return ticker in self._columns[field]
+
+    def column(self, ticker, field="Adj Close"):
+        return self._columns[field][ticker]
+
+    def _row(self, date):
+        position = self.calendar.position(date)
+        if position >= self.end:
+            raise ValueError(f"{date} is after the current date {self.date}")
+        return position
+
+    def price(self, ticker, date, field="Adj Close"):
+        """Price of "ticker" on the last trading day on or before "date".
+
+        Raises:
+            ValueError: "date" is after the current date.
+        """
+        return self._values[field][self._row(date), self._columns[field][ticker]]
+
+    def before(self, ticker, date, field="Close"):
+        """Price of "ticker" on the trading day before "date", e.g. the close before an ex-dividend date.
+
+        Raises:
+            ValueError: "date" is after the current date.
+        """
+        position = int(np.searchsorted(self.calendar.days, to_day(date), side="left")) - 1
+        if position >= self.end:
+            raise ValueError(f"{date} is after the current date {self.date}")
+        return self._values[field][position, self._columns[field][ticker]]
+
+    def window(self, field, lookback_days):
+        """Rows of "field" within "lookback_days" calendar days of the current date, as a view."""
+        start = self.calendar.window_start(self.date, lookback_days)
+        return self._frames[field].iloc[start:self.end]
+
+
+# Data sets portfolios can be reattached to, by data version. Only weak references are kept, so
+# registering a data set never keeps it alive; it stays available while its owner holds it.
+_contexts = {}
+
+def register_context(data, version=None):
+    """Makes a data set available to portfolios saved against it, see Portfolio.load.
+
+    The registry only references the data set weakly: it can be found until the caller drops it.
+
+    Args:
+        data (DataFrame or Context): Full data set.
+        version (str, optional): data_version of "data", if already known. Defaults to None.
+
+    Returns:
+        Context: Context of the data set, showing all rows.
+    """
+    if isinstance(data, Context):
+        if version is not None:
+            data._version = version
+        context = data.as_of(len(data.calendar) - 1)
+    else:
+        context = Context(data, version=version)
+    for key in [key for key, ref in _contexts.items() if ref() is None]:
+        del _contexts[key]
+    _contexts[context.version] = weakref.ref(context.data)
+    return context
+
+def unregister_context(version):
+    _contexts.pop(version, None)
+
+def find_context(version):
+    """Context of a registered data version.
+
+    Raises:
+        ValueError: No data set of "version" is registered, or it has been freed.
+
+    Returns:
+        Context: New view showing all rows.
+    """
+    data = _contexts[version]() if version in _contexts else None
+    if data is None:
+        _contexts.pop(version, None)
+        raise ValueError(f"Data version {version} is not loaded. Load that data set and pass it to register_context "
+                         f"or Portfolio.load, or set the portfolio's context")
+    return Context(data, version=version)
@@ -0,0 +1,105 @@
+import warnings
+import numpy as np
+import pandas as pd
+from .trading_calendar import TradingCalendar
+
+DIVIDEND = "dividend"
+SPLIT = "split"
+
+
+class CorporateActions:
+    """Dividends and splits of a data set, indexed by the trading day on which they take effect.
+
+    Events are resolved against the price data once: each one gets the row of its ex-date (the
+    first trading day on or after it) and the factor it applies to the average cost of a
+    holding. A dividend's factor uses the close before the ex-date, a split's is the inverse of
+    its ratio. A simulation then looks up a day's events by row without touching the prices.
+    Dividends without a close before their ex-date are dropped with a warning.
+    """
+    def __init__(self, events, context, field="Close"):
+        """CorporateActions initializer.
+
+        Args:
+            events (DataFrame): One row per event with "date" (ex-date), "ticker", "action" ("dividend" or
+                "split") and "value" (cash per share, or new shares per old share) columns.
+            context (DataFrame or Context): Price data the events are resolved against.
+            field (str, optional): Price field of the close before a dividend. Defaults to "Close".
+
+        Raises:
+            ValueError: Unknown action or non-positive split ratio.
+        """
+        unknown = set(events["action"]) - {DIVIDEND, SPLIT}
+        if unknown:
+            raise ValueError(f"Unknown corporate actions {sorted(unknown)}")
+        calendar = TradingCalendar(context.index)
+        days = pd.DatetimeIndex(events["date"]).values.astype("datetime64[D]")
+        positions = np.searchsorted(calendar.days, days, side="left")
+        keep = positions < len(calendar)
+        events = events[keep]
+        positions = positions[keep]
+
+        closes = context[field]
+        columns = {ticker: j for j, ticker in enumerate(closes.columns)}
+        close = closes.to_numpy(dtype=np.float64)
+        values = events["value"].to_numpy(dtype=np.float64)
+        actions = events["action"].to_numpy()
+        factors = np.empty(len(events))
+        for i, (ticker, position) in enumerate(zip(events["ticker"], positions)):
+            if actions[i] == SPLIT:
+                if values[i] <= 0:
+                    raise ValueError(f"Split ratio of {ticker} must be positive, got {values[i]}")
+                factors[i] = 1 / values[i]
+            elif position > 0 and ticker in columns:
+                factors[i] = 1 - values[i] / close[position - 1, columns[ticker]]
+            else:
+                factors[i] = np.nan
+
+        # A dividend on the first row, of a ticker without prices or after a missing close has no factor
+        resolved = ~np.isnan(factors)
+        if not resolved.all():
+            dropped = sorted(set(events["ticker"].to_numpy()[~resolved]))
+            warnings.warn(f"Dropped {int((~resolved).sum())} dividends without a close before their ex-date: "
+                          f"{' '.join(map(str, dropped))}")
+            events = events[resolved]
+            positions = positions[resolved]
+            days = days[keep][resolved]
+            values = values[resolved]
+            actions = actions[resolved]
+            factors = factors[resolved]
+        else:
+            days = days[keep]
+
+        order = np.argsort(positions, kind="stable")
+        self.positions = positions[order]
+        self.dates = days[order]
+        self.tickers = events["ticker"].to_numpy()[order]
+        self.actions = actions[order]
+        self.values = values[order]
+        self.factors = factors[order]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def on(self, position):
+        """Events taking effect on row "position".
+
+        Returns:
+            list: (ticker, action, value, factor, ex-date) tuples.
+        """
+        first = np.searchsorted(self.positions, position, side="left")
+        last = np.searchsorted(self.positions, position, side="right")
+        return list(zip(self.tickers[first:last], self.actions[first:last], self.values[first:last],
+                        self.factors[first:last], self.dates[first:last]))
+
+    def frame(self):
+        return pd.DataFrame({"position": self.positions, "date": self.dates, "ticker": self.tickers,
+                             "action": self.actions, "value": self.values, "factor": self.factors})
+
+    @staticmethod
+    def read(filename, context, field="Close"):
+        """Reads events from a CSV file with date, ticker, action and value columns.
+
+        Returns:
+            CorporateActions: Events resolved against "context".
+        """
+        return CorporateActions(pd.read_csv(filename, parse_dates=["date"]), context, field)
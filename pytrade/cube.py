@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from .analysis_1 import stochastic_metrics, stochastic_metric
+from .trading_calendar import to_day
+
+
+class AnalysisCube:
+    """Full-history analysis of one window pair: every column of analysis_1.stochastic for every date and ticker.
+
+    Everything is computed up front with array operations over the whole history, so serving
+    one day's analysis frame is an O(tickers) lookup instead of a recomputation.
+    """
+    def __init__(self, extrema, short, long, dtype=np.float64):
+        """Builds the cube from precomputed window highs/lows.
+
+        Args:
+            extrema (RollingExtrema): Window highs/lows of the full data set.
+            short (str): Short window name, e.g. "three_wk".
+            long (str): Long window name, e.g. "one_yr".
+            dtype (dtype, optional): Storage type. np.float32 halves the footprint but no longer
+                matches the direct calculation bit for bit. Defaults to np.float64.
+        """
+        self.extrema = extrema
+        self.short = short
+        self.long = long
+        self.columns = ["latest", f"{short}_high", f"{short}_low", f"{long}_high", f"{long}_low",
+                        f"{short}_range", f"{long}_range", "stochastic_difference", "potential", "metric"]
+
+        scale = extrema.index_values[:, None]
+        latest = extrema.ratios * scale
+        short_high, short_low = extrema.extrema[short][0] * scale, extrema.extrema[short][1] * scale
+        long_high, long_low = extrema.extrema[long][0] * scale, extrema.extrema[long][1] * scale
+        with np.errstate(divide="ignore", invalid="ignore"):
+            short_range, long_range, stochastic_difference, potential = stochastic_metrics(latest,
+                short_high, short_low, long_high, long_low)
+            metric = stochastic_metric(stochastic_difference, potential)
+
+        # dates x columns x tickers, so that one date is one contiguous block
+        self.values = np.empty((len(extrema.dates), len(self.columns), len(extrema.tickers)), dtype=dtype)
+        for k, column in enumerate([latest, short_high, short_low, long_high, long_low,
+                                    short_range, long_range, stochastic_difference, potential, metric]):
+            self.values[:, k, :] = column
+
+    @property
+    def nbytes(self):
+        """Bytes held by the cube, without the RollingExtrema it was built from."""
+        return self.values.nbytes
+
+    def frame(self, analysis_date, row=None):
+        """Analysis frame of one date.
+
+        Args:
+            analysis_date (date): Date of the analysis.
+            row (int, optional): Last row of data available. Defaults to the last row on or before "analysis_date".
+
+        Returns:
+            DataFrame: Analysis indexed by ticker, or None when "analysis_date" is not the row's
+                date (its windows differ from the precomputed ones).
+        """
+        calendar = self.extrema.calendar
+        if row is None:
+            row = calendar.position(analysis_date)
+        if row < 0 or calendar.days[row] != to_day(analysis_date):
+            return None
+        return pd.DataFrame(self.values[row].T, index=self.extrema.tickers, columns=self.columns, copy=True)
@@ -0,0 +1,6 @@
+from .data import *
+from .store import *
+from .fetcher import *
+from .panel import *
+from .download import *
+from .synthetic import *
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import pandas as pd
+from .store import PriceStore
+from .fetcher import YahooFetcher
+from .download import download
+from .panel import PricePanel
+
+
+def read_tickers(filename="./ticker.csv"):
+    """Reads the comma separated ticker universe.
+
+    Args:
+        filename (str, optional): Ticker file. Defaults to "./ticker.csv".
+
+    Returns:
+        list: Ticker symbols.
+    """
+    with open(filename, "r") as f:
+        return [t.strip() for t in f.read().split(",") if t.strip()]
+
+def refresh(store, fetcher, tickers, period="5y", end=None, chunk_size=100, workers=4, retries=3, backoff=1.0):
+    """Brings a store up to date by fetching only what it is missing.
+
+    Tickers already in the store are fetched from the day after their last stored date, and
+    not at all when no business day has passed since. Tickers new to the store are backfilled
+    over the full "period". Fetches are chunked and run in parallel (see download). The store
+    is compacted afterwards, so daily refreshes do not pile up segments.
+
+    Args:
+        store (PriceStore): Store to update.
+        fetcher (Fetcher): Source of prices.
+        tickers (list): Ticker universe to keep up to date.
+        period (str, optional): History to backfill for new tickers. Defaults to "5y".
+        end (date, optional): Last date to fetch. Defaults to None.
+        chunk_size (int, optional): Tickers per fetch. Defaults to 100.
+        workers (int, optional): Concurrent fetches. Defaults to 4.
+        retries (int, optional): Retries per chunk. Defaults to 3.
+        backoff (float, optional): Seconds before the first retry. Defaults to 1.0.
+
+    Raises:
+        RuntimeError: Some chunks failed after retrying. Every other chunk is already stored.
+
+    Returns:
+        int: Number of rows written.
+    """
+    last_dates = store.last_dates()
+    groups = {}
+    for ticker in tickers:
+        groups.setdefault(last_dates.get(ticker), []).append(ticker)
+
+    written = 0
+    failed = []
+    until = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end)
+    for last, group in groups.items():
+        start = None if last is None else last + pd.Timedelta(days=1)
+        if start is not None and len(pd.bdate_range(start, until)) == 0:
+            continue # Already up to date
+        rows, group_failed = download(group, fetcher, store, start=start, end=end, period=period,
+                                      chunk_size=chunk_size, workers=workers, retries=retries, backoff=backoff)
+        written += rows
+        failed.extend(group_failed)
+    if written > 0:
+        store.compact()
+    if len(failed) > 0:
+        raise RuntimeError(f"Failed to fetch {len(failed)} tickers: {' '.join(failed)}")
+    return written
+
+def get_data(period="5y", reload=True, store="./store", fields=("Adj Close", "Close"), tickers=None, start=None, end=None,
+             fetcher=None, incremental=True):
+    """Loads price data from the local store, optionally refreshing it first.
+
+    The loaded frame is registered (see register_context), so portfolios saved against the same
+    data reattach to it in Portfolio.load, also in a new process.
+
+    Args:
+        period (str, optional): History to download on reload. Defaults to "5y".
+        reload (bool, optional): Refresh the store before loading. Defaults to True.
+        store (str or PriceStore, optional): Local price store. Defaults to "./store".
+        fields (tuple, optional): Price fields to keep. Defaults to ("Adj Close", "Close").
+        tickers (list, optional): Tickers to load. Defaults to every stored ticker.
+        start (date, optional): First date to load. Defaults to None.
+        end (date, optional): Last date to load. Defaults to None.
+        fetcher (Fetcher, optional): Source of prices. Defaults to YahooFetcher.
+        incremental (bool, optional): Only fetch dates and tickers missing from the store. Otherwise the whole
+            history is fetched and replaces the store's contents. Defaults to True.
+
+    Returns:
+        DataFrame: Prices with (field, ticker) MultiIndex columns.
+    """
+    if not isinstance(store, PriceStore):
+        store = PriceStore(store)
+    if store.empty() and os.path.exists("./latest.pkl"):
+        # One-off migration of the old pickle cache, which a reload then only tops up
+        store.append(pd.read_pickle("./latest.pkl"))
+    if reload:
+        fetcher = YahooFetcher(fields) if fetcher is None else fetcher
+        if incremental:
+            refresh(store, fetcher, read_tickers(), period)
+        else:
+            store.replace(fetcher.fetch(read_tickers(), period=period))
+
+    # Imported here, pytrade.context depends on this package
+    from ..context import register_context
+    data = store.load(fields, tickers, start, end)
+    register_context(data)
+    return data
+
+def data_version(df):
+    """Content hash of a price frame, used to tell data sets apart in caches and saved files.
+
+    Args:
+        df (DataFrame or PricePanel): Price data. A panel has the version of the frame it was built from, if
+            stored at the same precision.
+
+    Returns:
+        str: Hex digest of the index, columns and values.
+    """
+    if isinstance(df, PricePanel):
+        df = df.to_frame()
+    digest = hashlib.sha1()
+    digest.update(str(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+def calculate_ratio(df, index="^GSPC",):
+    """
+    """
+    latest_index = df[index].iloc[-1]
+    ratios = df.iloc[:].div(df[index], axis=0) * latest_index # Better way to do this?
+    return ratios
+
+# def get_dividends():
+#     """
+#     """
+#     f = open("./ticker.csv", "r")
+#     tickers = f.read().split(",")
+#     for t in tickers:
+#         stock = yf.Ticker(t)
+#         df_dividends[t] = stock.get_dividends()
+#     df_dividends.to_pickle("./latest_dividends.pkl")
+#     return df_dividends
\ No newline at end of file
@@ -0,0 +1,56 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+
+
+def chunked(tickers, chunk_size):
+    return [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+
+def _fetch_chunk(fetcher, store, chunk, start, end, period, retries, backoff):
+    """Fetches one chunk with retries and writes it to the store. Runs in a worker thread."""
+    for attempt in range(retries + 1):
+        try:
+            df = fetcher.fetch(chunk, start=start, end=end, period=period)
+            break
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+    if start is not None:
+        df = df[df.index >= pd.Timestamp(start)]
+    df = df.dropna(how="all")
+    store.append(df)
+    return len(df.index)
+
+def download(tickers, fetcher, store, start=None, end=None, period="5y", chunk_size=100, workers=4, retries=3, backoff=1.0):
+    """Downloads a ticker universe in chunks over a bounded thread pool, writing each chunk to the store as it finishes.
+
+    A chunk that still fails after "retries" attempts is reported back instead of failing the
+    chunks that succeeded.
+
+    Args:
+        tickers (list): Tickers to download.
+        fetcher (Fetcher): Source of prices.
+        store (PriceStore): Store that receives every finished chunk.
+        start (date, optional): First date to fetch. Defaults to None.
+        end (date, optional): Last date to fetch. Defaults to None.
+        period (str, optional): Period to fetch when no start is given. Defaults to "5y".
+        chunk_size (int, optional): Tickers per fetch. Defaults to 100.
+        workers (int, optional): Concurrent fetches. Defaults to 4.
+        retries (int, optional): Retries per chunk. Defaults to 3.
+        backoff (float, optional): Seconds before the first retry, doubled on each retry. Defaults to 1.0.
+
+    Returns:
+        tuple: (rows written, list of tickers whose chunk failed).
+    """
+    rows = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_fetch_chunk, fetcher, store, chunk, start, end, period, retries, backoff): chunk
+                   for chunk in chunked(list(tickers), chunk_size)}
+        for future in as_completed(futures):
+            try:
+                rows += future.result()
+            except Exception:
+                failed.extend(futures[future])
+    return rows, failed
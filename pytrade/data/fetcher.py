@@ -0,0 +1,100 @@
+import random
+import re
+import threading
+import time
+import pandas as pd
+import yfinance as yf
+
+
+def period_start(end, period):
+    """Converts a yfinance style period ("5d", "3mo", "5y", "max") to a start date.
+
+    Args:
+        end (Timestamp): Last date of the period.
+        period (str): Period string.
+
+    Returns:
+        Timestamp: First date of the period, or None for "max".
+    """
+    if period is None or period == "max":
+        return None
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if match is None:
+        raise ValueError(f"Unknown period: {period}")
+    n, unit = int(match.group(1)), match.group(2)
+    offsets = {"d": pd.DateOffset(days=n), "wk": pd.DateOffset(weeks=n), "mo": pd.DateOffset(months=n), "y": pd.DateOffset(years=n)}
+    return pd.Timestamp(end) - offsets[unit]
+
+
+class Fetcher:
+    """Source of daily prices. Subclasses return a DataFrame with (field, ticker) MultiIndex columns."""
+    def __init__(self, fields=("Adj Close", "Close")):
+        self.fields = list(fields)
+
+    def fetch(self, tickers, start=None, end=None, period=None):
+        """Fetches prices for "tickers" between "start" and "end" (inclusive), or over "period".
+
+        Args:
+            tickers (list): Tickers to fetch.
+            start (date, optional): First date to fetch. Defaults to None.
+            end (date, optional): Last date to fetch. Defaults to None.
+            period (str, optional): Period to fetch when no start is given. Defaults to None.
+
+        Returns:
+            DataFrame: Prices with (field, ticker) MultiIndex columns.
+        """
+        raise NotImplementedError("Not implemented in base class") # defined in child class
+
+
+class YahooFetcher(Fetcher):
+    """Fetches prices from Yahoo Finance with yfinance."""
+    def fetch(self, tickers, start=None, end=None, period=None):
+        if start is None:
+            df = yf.download(" ".join(tickers), period=period, auto_adjust=False)
+        else:
+            # yfinance treats end as exclusive
+            end = None if end is None else pd.Timestamp(end) + pd.Timedelta(days=1)
+            df = yf.download(" ".join(tickers), start=start, end=end, auto_adjust=False)
+        if not isinstance(df.columns, pd.MultiIndex):
+            df.columns = pd.MultiIndex.from_product([df.columns, tickers])
+        return df[self.fields]
+
+
+class LocalFetcher(Fetcher):
+    """Serves prices from an in-memory DataFrame. Stands in for a remote source in offline runs,
+    optionally with simulated latency and random failures."""
+    def __init__(self, frame, fields=("Adj Close", "Close"), latency=0.0, failure_rate=0.0, seed=None):
+        """LocalFetcher initializer.
+
+        Args:
+            frame (DataFrame): Prices with (field, ticker) MultiIndex columns.
+            fields (tuple, optional): Fields to serve. Defaults to ("Adj Close", "Close").
+            latency (float, optional): Seconds to sleep per fetch. Defaults to 0.0.
+            failure_rate (float, optional): Probability that a fetch raises ConnectionError. Defaults to 0.0.
+            seed (int, optional): Seed for the failure draws. Defaults to None.
+        """
+        Fetcher.__init__(self, fields)
+        self.frame = frame
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def fetch(self, tickers, start=None, end=None, period=None):
+        with self._lock:
+            self.calls.append((tuple(tickers), start, end, period))
+            failed = self._random.random() < self.failure_rate
+        if self.latency > 0:
+            time.sleep(self.latency)
+        if failed:
+            raise ConnectionError(f"Simulated failure fetching {len(tickers)} tickers")
+        frame = self.frame
+        if end is not None:
+            frame = frame[frame.index <= pd.Timestamp(end)]
+        if start is None and len(frame.index) > 0:
+            start = period_start(frame.index[-1], period)
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start)]
+        available = [t for t in tickers if t in frame.columns.get_level_values(1)]
+        return frame.loc[:, (self.fields, available)]
@@ -0,0 +1,156 @@
+import json
+import numpy as np
+import pandas as pd
+
+
+class PricePanel:
+    """Dates x tickers x fields price array with date and ticker lookups.
+
+    A panel saved with "from_frame(..., path=...)" is an .npy file (plus a json header) that
+    "open" memory maps read-only, so every process opening the same file shares one copy of the
+    prices through the page cache. Date ranges, single tickers, contiguous ticker ranges and
+    fields are returned as views of the underlying array, never copies. A panel can stand in for
+    the DataFrame of a Context: "panel[field]" and "panel.index" work like on that DataFrame.
+    """
+    def __init__(self, values, dates, tickers, fields):
+        """Panel initializer.
+
+        Args:
+            values (ndarray): Array of shape (dates, tickers, fields). May be a memmap.
+            dates (DatetimeIndex): Row dates, sorted ascending.
+            tickers (list): Column tickers.
+            fields (list): Field names, e.g. ["Adj Close", "Close"].
+        """
+        self.values = values
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.fields = list(fields)
+        self._dates = self.dates.values
+        self._ticker_index = {t: i for i, t in enumerate(self.tickers)}
+        self._field_index = {f: i for i, f in enumerate(self.fields)}
+
+    @classmethod
+    def from_frame(cls, frame, path=None, dtype=np.float64):
+        """Builds a panel from a (field, ticker) MultiIndex DataFrame.
+
+        Args:
+            frame (DataFrame): Prices as returned by get_data.
+            path (str, optional): .npy file to write. The returned panel is memory mapped from it. Defaults to None.
+            dtype (dtype, optional): Storage type, np.float32 halves the footprint. Defaults to np.float64.
+
+        Returns:
+            PricePanel: Panel over the frame's prices.
+        """
+        fields = list(dict.fromkeys(frame.columns.get_level_values(0)))
+        tickers = list(dict.fromkeys(frame.columns.get_level_values(1)))
+        shape = (len(frame.index), len(tickers), len(fields))
+        if path is None:
+            values = np.empty(shape, dtype=dtype)
+        else:
+            values = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+        for k, field in enumerate(fields):
+            values[:, :, k] = frame[field].reindex(columns=tickers).to_numpy()
+        if path is None:
+            return cls(values, frame.index, tickers, fields)
+
+        values.flush()
+        del values
+        header = {"dates": [str(d) for d in frame.index], "tickers": tickers, "fields": fields}
+        with open(path + ".json", "w") as headerfile:
+            json.dump(header, headerfile)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path, mode="r"):
+        """Memory maps a panel written by "from_frame".
+
+        Args:
+            path (str): .npy file of the panel.
+            mode (str, optional): numpy mmap mode. Defaults to "r".
+
+        Returns:
+            PricePanel: Panel backed by the file.
+        """
+        with open(path + ".json", "r") as headerfile:
+            header = json.load(headerfile)
+        values = np.load(path, mmap_mode=mode)
+        return cls(values, pd.DatetimeIndex(header["dates"]), header["tickers"], header["fields"])
+
+    def __len__(self):
+        return len(self._dates)
+
+    @property
+    def index(self):
+        return self.dates
+
+    def __getitem__(self, field):
+        return self.frame(field)
+
+    def row(self, date):
+        """Position of the last row on or before "date".
+
+        Args:
+            date (date): Lookup date.
+
+        Returns:
+            int: Row position, -1 if "date" is before the first row.
+        """
+        return int(np.searchsorted(self._dates, pd.Timestamp(date).to_datetime64(), side="right")) - 1
+
+    def column(self, ticker):
+        return self._ticker_index[ticker]
+
+    def _columns(self, tickers):
+        if tickers is None:
+            return slice(None)
+        if isinstance(tickers, str):
+            return self._ticker_index[tickers]
+        cols = [self._ticker_index[t] for t in tickers]
+        if len(cols) > 0 and cols == list(range(cols[0], cols[0] + len(cols))):
+            return slice(cols[0], cols[0] + len(cols))
+        # Scattered tickers cannot be expressed as a view
+        return cols
+
+    def slice(self, start=None, end=None, tickers=None, field=None):
+        """Selects a date range (inclusive), tickers and optionally one field.
+
+        Args:
+            start (date, optional): First date. Defaults to the first row.
+            end (date, optional): Last date. Defaults to the last row.
+            tickers (str or list, optional): One ticker or a list of tickers. Defaults to all.
+            field (str, optional): One field. Defaults to all fields.
+
+        Returns:
+            ndarray: View of the panel, unless "tickers" is a non-contiguous list.
+        """
+        first = 0 if start is None else int(np.searchsorted(self._dates, pd.Timestamp(start).to_datetime64(), side="left"))
+        last = len(self._dates) if end is None else self.row(end) + 1
+        view = self.values[first:last]
+        view = view[:, self._columns(tickers)]
+        if field is not None:
+            view = view[..., self._field_index[field]]
+        return view
+
+    def frame(self, field, start=None, end=None):
+        """DataFrame of one field over a date range, wrapping a view of the panel.
+
+        Args:
+            field (str): Field to select.
+            start (date, optional): First date. Defaults to None.
+            end (date, optional): Last date. Defaults to None.
+
+        Returns:
+            DataFrame: Dates x tickers frame.
+        """
+        first = 0 if start is None else int(np.searchsorted(self._dates, pd.Timestamp(start).to_datetime64(), side="left"))
+        last = len(self._dates) if end is None else self.row(end) + 1
+        values = self.values[first:last, :, self._field_index[field]]
+        return pd.DataFrame(values, index=self.dates[first:last], columns=self.tickers, copy=False)
+
+    def to_frame(self):
+        """Copies the panel into a (field, ticker) MultiIndex DataFrame like the one get_data returns.
+
+        Returns:
+            DataFrame: Prices for every field.
+        """
+        return pd.concat({f: self.frame(f) for f in self.fields}, axis=1)
@@ -0,0 +1,286 @@
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+
+class PriceStore:
+    """Append-only columnar store for daily price fields.
+
+    Prices are written as segments. A segment holds one date partition (a calendar year) for a
+    set of tickers, with one ticker-major .npy file per field so that a load only touches the
+    tickers it asks for. A json manifest lists the tickers and segments. Appending never rewrites
+    existing segments; where segments overlap, the most recently written value wins. compact
+    merges the segments of a partition into one, so repeated appends do not pile up files.
+
+    Layout:
+        <path>/manifest.json
+        <path>/<partition>/<segment>.dates.npy
+        <path>/<partition>/<segment>.<field>.npy
+    """
+    MANIFEST = "manifest.json"
+
+    def __init__(self, path="./store"):
+        """Store initializer. The directory is created on first append.
+
+        Args:
+            path (str, optional): Directory holding the store. Defaults to "./store".
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        filename = os.path.join(self.path, self.MANIFEST)
+        if not os.path.exists(filename):
+            return {"fields": [], "tickers": [], "segments": [], "next_segment": 0}
+        with open(filename, "r") as manifest:
+            return json.load(manifest)
+
+    def _write_manifest(self):
+        filename = os.path.join(self.path, self.MANIFEST)
+        with open(filename + ".tmp", "w") as manifest:
+            json.dump(self.manifest, manifest)
+        os.replace(filename + ".tmp", filename)
+
+    @staticmethod
+    def _slug(field):
+        return field.lower().replace(" ", "_")
+
+    def _segment_file(self, segment, name):
+        return os.path.join(self.path, segment["partition"], f"{segment['id']:06d}.{name}.npy")
+
+    def _remove_files(self, segments):
+        for segment in segments:
+            for name in ["dates"] + [self._slug(field) for field in segment["fields"]]:
+                filename = self._segment_file(segment, name)
+                if os.path.exists(filename):
+                    os.remove(filename)
+
+    @property
+    def tickers(self):
+        return list(self.manifest["tickers"])
+
+    @property
+    def fields(self):
+        return list(self.manifest["fields"])
+
+    def empty(self):
+        return len(self.manifest["segments"]) == 0
+
+    def last_date(self):
+        """Latest date held by any segment.
+
+        Returns:
+            Timestamp: Last stored date, or None if the store is empty.
+        """
+        if self.empty():
+            return None
+        return max(pd.Timestamp(s["end"]) for s in self.manifest["segments"])
+
+    def last_dates(self):
+        """Latest stored date for each ticker, read from the manifest only.
+
+        Returns:
+            dict: Ticker to last Timestamp covered by a segment.
+        """
+        tickers = self.manifest["tickers"]
+        last = {}
+        for segment in self.manifest["segments"]:
+            end = pd.Timestamp(segment["end"])
+            for col in segment["columns"]:
+                if tickers[col] not in last or last[tickers[col]] < end:
+                    last[tickers[col]] = end
+        return last
+
+    def _write_segment(self, segment, part, fields, tickers):
+        """Writes the files of a segment holding the rows of "part" and records its date range."""
+        os.makedirs(os.path.join(self.path, segment["partition"]), exist_ok=True)
+        np.save(self._segment_file(segment, "dates"), part.index.values.astype("datetime64[ns]"))
+        for field in fields:
+            values = part[field].reindex(columns=tickers).to_numpy(dtype=np.float64)
+            np.save(self._segment_file(segment, self._slug(field)), np.ascontiguousarray(values.T))
+        segment["rows"] = len(part.index)
+        segment["start"] = str(part.index[0].date())
+        segment["end"] = str(part.index[-1].date())
+
+    def append(self, frame):
+        """Writes new rows to the store. Only the rows in "frame" are written.
+
+        Args:
+            frame (DataFrame): Prices with (field, ticker) MultiIndex columns and a DatetimeIndex.
+
+        Returns:
+            int: Number of segments written.
+        """
+        frame = frame.dropna(how="all")
+        if len(frame.index) == 0:
+            return 0
+        frame = frame.sort_index()
+        fields = list(dict.fromkeys(frame.columns.get_level_values(0)))
+        tickers = list(dict.fromkeys(frame.columns.get_level_values(1)))
+
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            for field in fields:
+                if field not in self.manifest["fields"]:
+                    self.manifest["fields"].append(field)
+            known = {t: i for i, t in enumerate(self.manifest["tickers"])}
+            for ticker in tickers:
+                if ticker not in known:
+                    known[ticker] = len(self.manifest["tickers"])
+                    self.manifest["tickers"].append(ticker)
+            columns = [known[t] for t in tickers]
+            partitions = frame.index.year
+            segments = []
+            for year in np.unique(partitions):
+                segments.append({
+                    "id": self.manifest["next_segment"],
+                    "partition": str(year),
+                    "columns": columns,
+                    "fields": fields,
+                    "rows": 0,
+                })
+                self.manifest["next_segment"] += 1
+
+        # Segment files are private to this call, so they can be written outside the lock
+        for segment in segments:
+            self._write_segment(segment, frame[partitions == int(segment["partition"])], fields, tickers)
+
+        with self._lock:
+            self.manifest["segments"].extend(segments)
+            self._write_manifest()
+        return len(segments)
+
+    def replace(self, frame):
+        """Replaces everything in the store with "frame".
+
+        The new rows are written before the old segments are dropped, so a failed write leaves
+        the old data in place.
+
+        Args:
+            frame (DataFrame): Prices with (field, ticker) MultiIndex columns and a DatetimeIndex.
+
+        Returns:
+            int: Number of segments written.
+        """
+        with self._lock:
+            old = list(self.manifest["segments"])
+        written = self.append(frame)
+        with self._lock:
+            ids = {segment["id"] for segment in old}
+            segments = [s for s in self.manifest["segments"] if s["id"] not in ids]
+            # Only keep the tickers and fields the new segments hold
+            used = list(dict.fromkeys(col for segment in segments for col in segment["columns"]))
+            remap = {col: i for i, col in enumerate(used)}
+            for segment in segments:
+                segment["columns"] = [remap[col] for col in segment["columns"]]
+            self.manifest["tickers"] = [self.manifest["tickers"][col] for col in used]
+            self.manifest["fields"] = list(dict.fromkeys(field for segment in segments for field in segment["fields"]))
+            self.manifest["segments"] = segments
+            self._write_manifest()
+        self._remove_files(old)
+        return written
+
+    def compact(self, partitions=None):
+        """Merges the segments of each partition into a single segment.
+
+        Values are merged with the same precedence as load (the most recent non-missing value
+        wins), so loads return the same data before and after.
+
+        Args:
+            partitions (list, optional): Partitions (years, as str) to compact. Defaults to every partition.
+
+        Returns:
+            int: Number of segments removed.
+        """
+        with self._lock:
+            by_partition = {}
+            for segment in self.manifest["segments"]:
+                by_partition.setdefault(segment["partition"], []).append(segment)
+            removed = []
+            merged_count = 0
+            for partition, segments in by_partition.items():
+                if len(segments) < 2 or (partitions is not None and partition not in partitions):
+                    continue
+                columns = list(dict.fromkeys(col for segment in segments for col in segment["columns"]))
+                tickers = [self.manifest["tickers"][col] for col in columns]
+                fields = list(dict.fromkeys(field for segment in segments for field in segment["fields"]))
+                frame = self._load(segments, fields, tickers).dropna(how="all")
+                ids = {segment["id"] for segment in segments}
+                if len(frame.index) > 0:
+                    merged = {"id": self.manifest["next_segment"], "partition": partition, "columns": columns,
+                              "fields": fields}
+                    self.manifest["next_segment"] += 1
+                    self._write_segment(merged, frame, fields, tickers)
+                    # The merged segment takes the place of the newest one it replaces, ahead of anything written later
+                    at = self.manifest["segments"].index(segments[-1])
+                    self.manifest["segments"][at] = merged
+                    ids.discard(segments[-1]["id"])
+                    merged_count += 1
+                self.manifest["segments"] = [s for s in self.manifest["segments"] if s["id"] not in ids]
+                removed.extend(segments)
+            if removed:
+                self._write_manifest()
+        self._remove_files(removed)
+        return len(removed) - merged_count
+
+    def load(self, fields=None, tickers=None, start=None, end=None):
+        """Reads prices from the store, touching only the requested tickers and date range.
+
+        Args:
+            fields (list, optional): Fields to load. Defaults to all stored fields.
+            tickers (list, optional): Tickers to load. Defaults to all stored tickers.
+            start (date, optional): First date to load (inclusive). Defaults to None.
+            end (date, optional): Last date to load (inclusive). Defaults to None.
+
+        Returns:
+            DataFrame: Prices with (field, ticker) MultiIndex columns.
+        """
+        fields = self.fields if fields is None else list(fields)
+        tickers = self.tickers if tickers is None else list(tickers)
+        with self._lock:
+            segments = list(self.manifest["segments"])
+        return self._load(segments, fields, tickers, start, end)
+
+    def _load(self, all_segments, fields, tickers, start=None, end=None):
+        start = None if start is None else pd.Timestamp(start)
+        end = None if end is None else pd.Timestamp(end)
+        wanted = {t: i for i, t in enumerate(tickers)}
+        known = self.manifest["tickers"]
+
+        segments = []
+        for segment in all_segments:
+            if start is not None and pd.Timestamp(segment["end"]) < start:
+                continue
+            if end is not None and pd.Timestamp(segment["start"]) > end:
+                continue
+            src = [j for j, col in enumerate(segment["columns"]) if known[col] in wanted]
+            if len(src) == 0:
+                continue
+            dates = np.load(self._segment_file(segment, "dates"))
+            keep = np.ones(len(dates), dtype=bool)
+            if start is not None:
+                keep &= dates >= start.to_datetime64()
+            if end is not None:
+                keep &= dates <= end.to_datetime64()
+            if keep.any():
+                dst = [wanted[known[segment["columns"][j]]] for j in src]
+                segments.append((segment, dates[keep], keep, np.array(src), np.array(dst)))
+
+        index = np.unique(np.concatenate([s[1] for s in segments])) if segments else np.array([], dtype="datetime64[ns]")
+        values = np.full((len(fields), len(index), len(tickers)), np.nan)
+        for segment, dates, keep, src, dst in segments:
+            rows = np.searchsorted(index, dates)
+            for k, field in enumerate(fields):
+                if field not in segment["fields"]:
+                    continue
+                stored = np.load(self._segment_file(segment, self._slug(field)), mmap_mode="r")
+                block = stored[src][:, keep].T
+                target = values[k][rows[:, None], dst]
+                values[k][rows[:, None], dst] = np.where(np.isnan(block), target, block)
+
+        columns = pd.MultiIndex.from_product([fields, tickers])
+        data = values.transpose(1, 0, 2).reshape(len(index), len(fields) * len(tickers))
+        return pd.DataFrame(data, index=pd.DatetimeIndex(index, name="Date"), columns=columns)
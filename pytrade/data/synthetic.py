@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+
+def synthetic_panel(tickers=50, years=1, seed=0, index="^GSPC", start="2000-01-03", drift=0.0003, volatility=0.015,
+                    fields=("Adj Close", "Close")):
+    """Seeded random walk price panel in the layout of get_data, for benchmarks and offline experiments.
+
+    Every ticker follows a geometric random walk driven by a shared market factor and its own
+    noise. The index is the market factor alone. "Close" is "Adj Close" scaled by a constant
+    per ticker, as if a fixed dividend had been adjusted out.
+
+    Args:
+        tickers (int, optional): Number of stocks, excluding the index. Defaults to 50.
+        years (number, optional): History length, in years of 252 trading days. Defaults to 1.
+        seed (int, optional): Seed of the random generator. The same seed always gives the same panel. Defaults to 0.
+        index (str, optional): Index ticker. Defaults to "^GSPC".
+        start (str, optional): First date. Defaults to "2000-01-03".
+        drift (float, optional): Mean daily log return. Defaults to 0.0003.
+        volatility (float, optional): Daily log return standard deviation. Defaults to 0.015.
+        fields (tuple, optional): Price fields to produce. Defaults to ("Adj Close", "Close").
+
+    Returns:
+        DataFrame: Business days x (field, ticker) MultiIndex columns.
+    """
+    rng = np.random.default_rng(seed)
+    days = int(round(years * 252))
+    dates = pd.bdate_range(start, periods=days)
+    names = [f"T{i:04d}" for i in range(tickers)] + [index]
+
+    market = rng.normal(drift, volatility / 2, size=(days, 1))
+    beta = rng.uniform(0.5, 1.5, size=tickers)
+    returns = np.empty((days, tickers + 1))
+    returns[:, :tickers] = market * beta + rng.normal(0, volatility, size=(days, tickers))
+    returns[:, tickers] = market[:, 0]
+    adj_close = rng.uniform(10, 200, size=tickers + 1) * np.exp(np.cumsum(returns, axis=0))
+
+    ratio = {"Adj Close": np.ones(tickers + 1), "Close": 1 + rng.uniform(0, 0.05, size=tickers + 1)}
+    values = np.hstack([adj_close * ratio.get(field, 1) for field in fields])
+    columns = pd.MultiIndex.from_product([list(fields), names])
+    return pd.DataFrame(values, index=dates, columns=columns)
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from .trading_calendar import TradingCalendar
+
+# Calendar day lookbacks of the stochastic windows
+WINDOWS = {"three_wk": 21, "three_m": 91, "one_yr": 365}
+
+
+def rolling_extrema(values, starts):
+    """Rolling high and low of every column over variable length windows [starts[i], i].
+
+    Uses a doubling (sparse table) scheme vectorized over the columns: level k holds the
+    extremum of every 2**k row block, and each window is covered by two overlapping blocks of
+    the largest level that fits in it. Levels are built once and shared by all windows, so the
+    cost is O(rows x columns x log(longest window)) instead of O(rows x columns x window).
+    NaNs are skipped like DataFrame.max/min.
+
+    Args:
+        values (ndarray): Rows x columns array.
+        starts (dict): Window name to array of start rows.
+
+    Returns:
+        dict: Window name to (high, low) arrays shaped like "values".
+    """
+    rows = np.arange(len(values))
+    levels = {}
+    for name, start in starts.items():
+        levels[name] = np.floor(np.log2(rows - start + 1)).astype(int)
+    top = max([int(lev.max()) for lev in levels.values() if len(lev) > 0], default=0)
+
+    out = {name: (np.empty(values.shape), np.empty(values.shape)) for name in starts}
+    high = values
+    low = values
+    for k in range(top + 1):
+        if k > 0:
+            step = 1 << (k - 1)
+            high = np.fmax(high[:-step], high[step:])
+            low = np.fmin(low[:-step], low[step:])
+        for name, start in starts.items():
+            at = rows[levels[name] == k]
+            if len(at) == 0:
+                continue
+            first = start[at]
+            last = at - (1 << k) + 1
+            out[name][0][at] = np.fmax(high[first], high[last])
+            out[name][1][at] = np.fmin(low[first], low[last])
+    return out
+
+
+class RollingExtrema:
+    """Window highs and lows of the index-relative price ratios, for every date and ticker.
+
+    Ratios are stored relative to the index (price / index). calculate_ratio additionally
+    scales by the index's latest value; that factor is applied on lookup, which yields exactly
+    the values a direct calculation on the data up to the analysis date produces.
+    """
+    def __init__(self, adj_close, windows=WINDOWS, index="^GSPC"):
+        """Computes every window in one pass over "adj_close".
+
+        Args:
+            adj_close (DataFrame): Dates x tickers adjusted close prices.
+            windows (dict, optional): Window name to lookback in calendar days. Defaults to WINDOWS.
+            index (str, optional): Index the ratios are taken against. Defaults to "^GSPC".
+        """
+        self.index = index
+        self.windows = dict(windows)
+        self.dates = adj_close.index
+        self.tickers = adj_close.columns
+        self.calendar = TradingCalendar(self.dates)
+        self.index_values = adj_close[index].to_numpy(dtype=np.float64)
+        self.ratios = adj_close.to_numpy(dtype=np.float64) / self.index_values[:, None]
+        self.starts = {name: self.calendar.window_starts(days) for name, days in self.windows.items()}
+        self.extrema = rolling_extrema(self.ratios, self.starts)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the ratio and extrema arrays."""
+        arrays = [self.index_values, self.ratios] + list(self.starts.values()) + \
+            [array for pair in self.extrema.values() for array in pair]
+        return sum(array.nbytes for array in arrays)
+
+    def covers(self, adj_close_df):
+        """Whether "adj_close_df" is a leading slice of the data the extrema were built from."""
+        n = len(adj_close_df.index)
+        return 0 < n <= len(self.dates) and adj_close_df.index[-1] == self.dates[n - 1] and \
+            adj_close_df.columns.equals(self.tickers)
+
+    def frame(self, analysis_date, windows, row=None):
+        """Latest ratio and window highs/lows as of a row, in the column layout of the analysis frames.
+
+        Args:
+            analysis_date (date): Date the windows are measured back from.
+            windows (list): Window names to include.
+            row (int, optional): Last row of data available. Defaults to the last row on or before "analysis_date".
+
+        Returns:
+            DataFrame: "latest" and "<window>_high"/"<window>_low" columns indexed by ticker.
+        """
+        if row is None:
+            row = self.calendar.position(analysis_date)
+        scale = self.index_values[row]
+
+        analysis = pd.DataFrame({"latest": self.ratios[row] * scale}, index=self.tickers)
+        for name in windows:
+            start = self.calendar.window_start(analysis_date, self.windows[name])
+            if start == self.starts[name][row]:
+                high = self.extrema[name][0][row]
+                low = self.extrema[name][1][row]
+            else:
+                # Analysis date is not the row's date, e.g. a simulation starting on a holiday
+                window = self.ratios[start:row + 1]
+                high = np.fmax.reduce(window, axis=0) if len(window) else np.full(len(self.tickers), np.nan)
+                low = np.fmin.reduce(window, axis=0) if len(window) else np.full(len(self.tickers), np.nan)
+            analysis[f"{name}_high"] = high * scale
+            analysis[f"{name}_low"] = low * scale
+        return analysis
@@ -1,3 +1,7 @@
 from .portfolio import *
 from .stock import *
-from .transaction import *
\ No newline at end of file
+from .holdings import *
+from .history import *
+from .transaction import *
+from .journal import *
+from .returns import *
\ No newline at end of file
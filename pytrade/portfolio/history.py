@@ -0,0 +1,81 @@
+import itertools
+
+
+class History:
+    """Transaction list that forks in constant time.
+
+    The transactions are kept in segments: (list, length) pairs shared with other histories,
+    followed by a tail list owned by this history. Appends and pops only touch the tail, or
+    shorten the last shared segment without modifying its list, so a fork shares every
+    transaction with its parent and neither sees the other's later changes.
+    """
+    def __init__(self, transactions=()):
+        self._segments = () # Shared (list, length) pairs, oldest first
+        self._tail = list(transactions)
+        self._length = len(self._tail)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return itertools.chain(*(itertools.islice(items, length) for items, length in self._segments), self._tail)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._length)
+            if step == 1:
+                return list(itertools.islice(self._iter_from(start), max(stop - start, 0)))
+            return list(itertools.islice(self, start, stop, step))
+        if i < 0:
+            i += self._length
+        if i < 0 or i >= self._length:
+            raise IndexError("History index out of range")
+        shared = self._length - len(self._tail)
+        if i >= shared:
+            return self._tail[i - shared]
+        for items, length in self._segments:
+            if i < length:
+                return items[i]
+            i -= length
+
+    def _iter_from(self, start):
+        """Iterates from transaction "start" on, skipping whole segments before it."""
+        for items, length in self._segments:
+            if start < length:
+                yield from items[start:length]
+                start = 0
+            else:
+                start -= length
+        yield from self._tail[start:]
+
+    def append(self, transaction):
+        self._tail.append(transaction)
+        self._length += 1
+
+    def pop(self):
+        """Removes and returns the last transaction."""
+        if self._tail:
+            self._length -= 1
+            return self._tail.pop()
+        while self._segments:
+            items, length = self._segments[-1]
+            if length:
+                self._segments = self._segments[:-1] + ((items, length - 1),)
+                self._length -= 1
+                return items[length - 1]
+            self._segments = self._segments[:-1]
+        raise IndexError("pop from empty History")
+
+    def fork(self):
+        """New history with the same transactions, sharing them with this one."""
+        if self._tail:
+            self._segments = self._segments + ((self._tail, len(self._tail)),)
+            self._tail = []
+        history = History()
+        history._segments = self._segments
+        history._length = self._length
+        return history
+
+    def __reduce__(self):
+        # Pickled as one flat list, without the shared segments
+        return (History, (list(self),))
@@ -0,0 +1,137 @@
+import numpy as np
+from .stock import Stock
+
+
+class Holdings:
+    """Stock positions in parallel arrays, indexed by ticker.
+
+    Shares, average costs and the context column of every position are stored in arrays whose
+    first len(self) rows are live, so a ticker lookup is a dict access and the value of all
+    positions is one dot product with the context's latest prices. Removing a position moves the
+    last row into its place. Iterating yields Stock views in the order the positions were added,
+    like the list of Stocks this replaces.
+    """
+    def __init__(self, stocks=(), capacity=16):
+        """Holdings initializer.
+
+        Args:
+            stocks (list, optional): Stocks to start with. Defaults to none.
+            capacity (int, optional): Initial rows of the arrays. They grow as needed. Defaults to 16.
+        """
+        self.shares = np.zeros(capacity)
+        self.avg_cost = np.zeros(capacity)
+        self.columns = np.full(capacity, -1, dtype=np.int64) # Column of each position in the bound context
+        self._views = {} # Ticker to Stock view, in the order the positions were added
+        self._stocks = [] # Stock view of each row
+        self._column_ids = None # Ticker to column of the bound context
+        for stock in stocks:
+            self.add(stock.ticker, stock.num_shares, stock.avg_cost)
+
+    def __len__(self):
+        return len(self._stocks)
+
+    def __iter__(self):
+        return iter(list(self._views.values()))
+
+    def __contains__(self, ticker):
+        return ticker in self._views
+
+    def __getitem__(self, i):
+        return list(self._views.values())[i]
+
+    def get(self, ticker):
+        """Stock view of "ticker", or None when it is not held."""
+        return self._views.get(ticker)
+
+    def add(self, ticker, num_shares, avg_cost):
+        """Adds a position for a ticker that is not held yet.
+
+        Returns:
+            Stock: View of the new position.
+        """
+        row = len(self._stocks)
+        if row == len(self.shares):
+            self.shares = np.concatenate([self.shares, np.zeros(row)])
+            self.avg_cost = np.concatenate([self.avg_cost, np.zeros(row)])
+            self.columns = np.concatenate([self.columns, np.full(row, -1, dtype=np.int64)])
+        self.shares[row] = num_shares
+        self.avg_cost[row] = avg_cost
+        self.columns[row] = -1 if self._column_ids is None else self._column_ids.get(ticker, -1)
+        stock = Stock.__new__(Stock)
+        stock.ticker = ticker
+        stock._holdings = self
+        stock._row = row
+        self._views[ticker] = stock
+        self._stocks.append(stock)
+        return stock
+
+    def append(self, stock):
+        self.add(stock.ticker, stock.num_shares, stock.avg_cost)
+
+    def remove(self, stock):
+        """Removes the position of "stock". The view keeps its last values but no longer tracks the store."""
+        view = self._views.pop(stock.ticker)
+        row = view._row
+        last = len(self._stocks) - 1
+        moved = self._stocks.pop()
+        view._detach()
+        if row != last:
+            self.shares[row] = self.shares[last]
+            self.avg_cost[row] = self.avg_cost[last]
+            self.columns[row] = self.columns[last]
+            moved._row = row
+            self._stocks[row] = moved
+
+    def sort(self, key=None, reverse=False):
+        """Reorders the iteration order, like list.sort. The arrays are not moved."""
+        order = sorted(self._views.values(), key=key, reverse=reverse)
+        self._views = {stock.ticker: stock for stock in order}
+
+    def copy(self):
+        """Independent Holdings with the same positions, in the same order and bound to the same context."""
+        holdings = Holdings(capacity=max(len(self._stocks), 16))
+        holdings._column_ids = self._column_ids
+        for stock in self._stocks:
+            holdings.add(stock.ticker, self.shares[stock._row], self.avg_cost[stock._row])
+        holdings._views = {ticker: holdings._views[ticker] for ticker in self._views}
+        return holdings
+
+    def bind(self, context, field="Adj Close"):
+        """Maps every position to its column in "context", for value and max_holding.
+
+        Args:
+            context (Context): Price context, or None to unbind.
+            field (str, optional): Price field positions are valued at. Defaults to "Adj Close".
+        """
+        self._column_ids = None if context is None else context._columns[field]
+        for stock in self._stocks:
+            self.columns[stock._row] = -1 if self._column_ids is None else self._column_ids.get(stock.ticker, -1)
+
+    def _prices(self, context):
+        n = len(self._stocks)
+        columns = self.columns[:n]
+        if n and columns.min() < 0:
+            missing = [stock.ticker for stock in self._stocks if self.columns[stock._row] < 0]
+            raise KeyError(f"No prices for {missing} in the context")
+        return context.latest_row()[columns]
+
+    def values(self, context):
+        """Value of each position (shares x latest price), in row order."""
+        return self.shares[:len(self._stocks)] * self._prices(context)
+
+    def value(self, context):
+        """Total value of the positions at the latest prices of "context"."""
+        n = len(self._stocks)
+        return float(np.dot(self.shares[:n], self._prices(context))) if n else 0
+
+    def __getstate__(self):
+        # Views are rebuilt on load
+        n = len(self._stocks)
+        return {"tickers": [stock.ticker for stock in self._stocks], "order": list(self._views),
+                "shares": self.shares[:n].copy(), "avg_cost": self.avg_cost[:n].copy()}
+
+    def __setstate__(self, state):
+        self.__init__(capacity=max(len(state["tickers"]), 16))
+        for ticker, shares, avg_cost in zip(state["tickers"], state["shares"], state["avg_cost"]):
+            self.add(ticker, shares, avg_cost)
+        self._views = {ticker: self._views[ticker] for ticker in state["order"]}
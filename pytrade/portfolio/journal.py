@@ -0,0 +1,153 @@
+import atexit
+import datetime
+import json
+import os
+import weakref
+import zlib
+import pandas as pd
+from .stock import Stock
+from .transaction import DepositTransaction, StockTransaction, DividendTransaction, SplitTransaction, TransactionType
+
+
+def _encode_date(value):
+    if isinstance(value, datetime.datetime):
+        return pd.Timestamp(value).isoformat()
+    return value.isoformat()
+
+def _decode_date(value):
+    return datetime.date.fromisoformat(value) if len(value) == 10 else pd.Timestamp(value)
+
+def transaction_record(transaction):
+    """Journal record of a transaction.
+
+    Args:
+        transaction (Transaction): Transaction to write.
+
+    Returns:
+        dict: JSON serializable fields of the transaction.
+    """
+    record = {"type": transaction.type.value, "date": _encode_date(transaction.date)}
+    if transaction.type == TransactionType.DEPOSIT:
+        record["value"] = transaction.value
+    elif transaction.type in (TransactionType.BUY, TransactionType.SELL):
+        record["ticker"] = transaction.stock.ticker
+        record["num_shares"] = transaction.stock.num_shares
+        record["avg_cost"] = transaction.stock.avg_cost
+    elif transaction.type == TransactionType.DIVIDEND:
+        record["ticker"] = transaction.ticker
+        record["dividend"] = transaction.dividend
+    elif transaction.type == TransactionType.SPLIT:
+        record["ticker"] = transaction.ticker
+        record["ratio"] = transaction.ratio
+    return record
+
+def record_transaction(record):
+    """Transaction of a journal record, the inverse of transaction_record."""
+    kind = TransactionType(record["type"])
+    date = _decode_date(record["date"])
+    if kind == TransactionType.DEPOSIT:
+        return DepositTransaction(date, kind, record["value"])
+    if kind == TransactionType.DIVIDEND:
+        return DividendTransaction(date, kind, record["dividend"], record["ticker"])
+    if kind == TransactionType.SPLIT:
+        return SplitTransaction(date, kind, record["ratio"], record["ticker"])
+    stock = Stock(record["ticker"], record["num_shares"], 1)
+    stock.avg_cost = record["avg_cost"]
+    return StockTransaction(date, kind, stock)
+
+
+class Journal:
+    """Append-only, checksummed log of portfolio events, one JSON line each.
+
+    Every line is "<crc32 of the payload> <payload>". Records are buffered and written in
+    batches of "flush_every", and synced to disk on flush, close and when the interpreter exits,
+    so a crash loses at most the records since the last of these. Set "flush_every" to 1 to
+    write and sync every record as it is appended. A line cut short by a crash fails its
+    checksum and is dropped, together with anything after it, when the journal is next opened
+    or read.
+    """
+    def __init__(self, path, flush_every=64, sync=True):
+        """Opens a journal for appending, creating it if needed.
+
+        Args:
+            path (str): Journal file.
+            flush_every (int, optional): Records buffered before they are written. Defaults to 64.
+            sync (bool, optional): fsync the file on every flush. Defaults to True.
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.sync = sync
+        records, valid = Journal._scan(path)
+        self.seq = records[-1]["seq"] if records else 0
+        if os.path.exists(path) and os.path.getsize(path) != valid:
+            # Drop a torn tail so new records are not appended after it
+            with open(path, "r+b") as journal:
+                journal.truncate(valid)
+        self._file = open(path, "ab")
+        self._pending = []
+        _open_journals.add(self)
+
+    def append(self, record):
+        """Adds a record and returns its sequence number."""
+        self.seq += 1
+        payload = json.dumps(dict(record, seq=self.seq), separators=(",", ":")).encode()
+        self._pending.append(b"%08x %s\n" % (zlib.crc32(payload), payload))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+        return self.seq
+
+    def flush(self):
+        """Writes the buffered records and, if "sync", forces them to disk."""
+        if self._pending:
+            self._file.write(b"".join(self._pending))
+            self._pending = []
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+        _open_journals.discard(self)
+
+    @staticmethod
+    def _scan(path):
+        records = []
+        valid = 0
+        if not os.path.exists(path):
+            return records, valid
+        with open(path, "rb") as journal:
+            for line in journal:
+                if not line.endswith(b"\n") or len(line) < 10:
+                    break
+                crc, payload = line[:8], line[9:-1]
+                try:
+                    if int(crc, 16) != zlib.crc32(payload):
+                        break
+                    records.append(json.loads(payload))
+                except ValueError:
+                    break
+                valid += len(line)
+        return records, valid
+
+    @staticmethod
+    def read(path, after=0):
+        """Valid records of a journal.
+
+        Args:
+            path (str): Journal file.
+            after (int, optional): Only return records with a higher sequence number. Defaults to 0.
+
+        Returns:
+            list: Records in write order.
+        """
+        return [record for record in Journal._scan(path)[0] if record["seq"] > after]
+
+
+_open_journals = weakref.WeakSet() # Journals that may hold buffered records
+
+@atexit.register
+def _close_journals():
+    for journal in list(_open_journals):
+        journal.close()
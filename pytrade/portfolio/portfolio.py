@@ -1,12 +1,24 @@
 from .stock import Stock
-from .transaction import DepositTransaction, StockTransaction, DividendTransaction, TransactionType
+from .holdings import Holdings
+from .history import History
+from .transaction import DepositTransaction, StockTransaction, DividendTransaction, SplitTransaction, TransactionType
+from .journal import Journal, transaction_record, record_transaction
+from .returns import rate_of_return, cash_flows
+import os
 import pickle
+import warnings
+from collections import deque
 from datetime import date
-import scipy.optimize as opt
-import pandas as pd
+from ..context import Context, register_context, find_context
+from ..profiler import profiled
 
 def autosave(func):
-    """Decorator that saves a portfolio after an operation if the autosave property is True.
+    """Decorator that journals an operation if the autosave property is True.
+
+    The transaction the operation added is appended to the portfolio's journal with the buy power
+    and the position of the stock afterwards, which costs the same however large the portfolio
+    is. Records are written and synced in batches of journal_flush_every, and by flush, close
+    and save. Every "snapshot_every" records the whole portfolio is snapshotted, see save.
 
     Args:
         func (function): function to wrap with autosave decorator. Function is invoked before save check.
@@ -14,12 +26,31 @@ def autosave(func):
     def save_wrapper(self, *args, **kwargs):
         res = func(self, *args, **kwargs)
         if(self.autosave):
-            self.save()
-            print(f"Saved portfolio: {self.name}")
+            self._journal_transaction(self.history[-1])
         return res
     return save_wrapper
 
+def undoable(func):
+    """Decorator that records the buy power and stock position before and after an operation, see undo and redo.
+
+    Args:
+        func (function): Operation adding one transaction. Its first argument, if a str, is the ticker it changes.
+    """
+    def undo_wrapper(self, *args, **kwargs):
+        ticker = args[0] if args and isinstance(args[0], str) else kwargs.get("ticker")
+        self._own_stocks()
+        before = (self.buy_power, self._position(ticker))
+        res = func(self, *args, **kwargs)
+        self._undo.append((self.history[-1], ticker, before, (self.buy_power, self._position(ticker))))
+        self._redo.clear()
+        return res
+    return undo_wrapper
+
 class Portfolio:
+    profiler = None # Profiler timing the bookkeeping, see pytrade.profiler
+    undo_limit = 100 # Operations that can be undone
+    journal_flush_every = 64 # Autosaved records buffered before they are written and synced, 1 to sync every operation
+
     def __init__(self, name, data):
         """Portfolio initializer.
 
@@ -29,13 +60,195 @@ class Portfolio:
         """
         self.name = name   # P
         self.buy_power = 0
-        self.stocks = [] # List of Stocks
-        self.context = data # DataFrame
+        self.stocks = Holdings() # Stocks by ticker
+        self.data_version = None # data_version of the context the portfolio was saved with
+        self.context = data # Context
         self.autosave = False
         self.logging = True
         self.history = [] # List of Transactions
+        self.snapshot_every = 1000 # Journal records between automatic snapshots
+        self._journal = None # Journal, opened on the first autosaved operation
+        self._logfile = None # Log file, kept open between transactions
+        self._undo = deque(maxlen=self.undo_limit) # (transaction, ticker, state before, state after) per operation
+        self._redo = [] # Undone operations, most recent last
+        self._stocks_shared = False # Stocks are shared with a fork and copied before the first change
+
+    def __getstate__(self):
+        # A profiler belongs to one run and open files to one process, neither is pickled. The price
+        # context is replaced by its data version and reattached on first use, see context.
+        state = self.__dict__.copy()
+        state.pop("profiler", None)
+        state["_journal"] = None
+        state["_logfile"] = None
+        state["_context"] = None
+        state["data_version"] = self._saved_version(register=False)
+        state["_undo"] = None
+        state["_redo"] = None
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        # Portfolios saved before Context kept the DataFrame itself as "context"
+        if "context" in state:
+            context = state.pop("context")
+            state.setdefault("_context", context if context is None or isinstance(context, Context) else Context(context))
+        self.__dict__.update({"snapshot_every": 1000, "_journal": None, "_logfile": None, "data_version": None,
+                              "_context": None})
+        self.__dict__.update(state)
+        self._undo = deque(maxlen=self.undo_limit)
+        self._redo = []
+        self._stocks_shared = False
+        # Portfolios saved before Holdings kept a list of Stocks, and before History a list of Transactions
+        self.stocks = state.get("_stocks", state.get("stocks", []))
+        self.history = state.get("_history", state.get("history", []))
+        self.__dict__.pop("stocks", None)
+        self.__dict__.pop("history", None)
+
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, transactions):
+        self._history = transactions if isinstance(transactions, History) else History(transactions)
+
+    def _own_stocks(self):
+        if self._stocks_shared:
+            self._stocks = self._stocks.copy()
+            self._stocks_shared = False
+
+    def _position(self, ticker):
+        stock = None if ticker is None else self.stocks.get(ticker)
+        return None if stock is None else (stock.num_shares, stock.avg_cost)
+
+    def _set_position(self, ticker, position):
+        stock = self.stocks.get(ticker)
+        if position is None:
+            if stock is not None:
+                self.stocks.remove(stock)
+        elif stock is None:
+            self.stocks.add(ticker, *position)
+        else:
+            stock.num_shares, stock.avg_cost = position
+
+    def undo(self):
+        """Reverts the last operation (deposit, buy, sell, dividend or split) in constant time.
+
+        An undone sale of a whole position puts the stock back at the end of "stocks".
+
+        Raises:
+            ValueError: Nothing to undo.
+
+        Returns:
+            Transaction: The undone transaction.
+        """
+        if not self._undo:
+            raise ValueError("Nothing to undo")
+        self._own_stocks()
+        transaction, ticker, before, after = self._undo.pop()
+        self.history.pop()
+        self.buy_power = before[0]
+        if ticker is not None:
+            self._set_position(ticker, before[1])
+        self._redo.append((transaction, ticker, before, after))
+        self.log(f"UNDO {transaction}")
+        if self.autosave:
+            self._journal_record({"type": "UNDO", "ticker": ticker, "buy_power": self.buy_power,
+                                  "position": None if before[1] is None else list(before[1])})
+        return transaction
+
+    def redo(self):
+        """Reapplies the last undone operation in constant time.
+
+        Raises:
+            ValueError: Nothing to redo, e.g. another operation happened after the undo.
+
+        Returns:
+            Transaction: The redone transaction.
+        """
+        if not self._redo:
+            raise ValueError("Nothing to redo")
+        self._own_stocks()
+        transaction, ticker, before, after = self._redo.pop()
+        self.history.append(transaction)
+        self.buy_power = after[0]
+        if ticker is not None:
+            self._set_position(ticker, after[1])
+        self._undo.append((transaction, ticker, before, after))
+        self.log(transaction)
+        if self.autosave:
+            self._journal_transaction(transaction)
+        return transaction
+
+    def fork(self, name=None):
+        """Independent copy of the portfolio that shares its state until either one changes it.
+
+        The history is shared for good (see History), the stock positions until the first change
+        on either side, and the price context always. The fork neither autosaves nor logs.
+
+        Args:
+            name (str, optional): Name of the fork. Defaults to "<name>_fork".
+
+        Returns:
+            Portfolio: The fork. Its undo history is the parent's.
+        """
+        portfolio = Portfolio.__new__(Portfolio)
+        portfolio.__dict__.update(self.__dict__)
+        portfolio.name = f"{self.name}_fork" if name is None else name
+        portfolio.autosave = False
+        portfolio.logging = False
+        portfolio._journal = None
+        portfolio._logfile = None
+        portfolio._history = self._history.fork()
+        portfolio._undo = deque(self._undo, maxlen=self._undo.maxlen)
+        portfolio._redo = list(self._redo)
+        self._stocks_shared = portfolio._stocks_shared = True
+        return portfolio
+
+    @property
+    def stocks(self):
+        return self._stocks
+
+    @stocks.setter
+    def stocks(self, stocks):
+        """Sets the stock positions. A list of Stocks is copied into a Holdings store.
+
+        Args:
+            stocks (Holdings or list): Stock positions.
+        """
+        self._stocks = stocks if isinstance(stocks, Holdings) else Holdings(stocks)
+        self._stocks_shared = False
+        self._stocks.bind(self.__dict__.get("_context"))
+
+    @property
+    def context(self):
+        """Price context. A loaded portfolio is reattached to the registered data set of its data version here.
+
+        Raises:
+            ValueError: The data set the portfolio was saved with is not registered, see register_context.
+        """
+        if self._context is None and self.data_version is not None:
+            self.context = find_context(self.data_version)
+        return self._context
+
+    @context.setter
+    def context(self, data):
+        """Sets the price context. A DataFrame is wrapped in a Context showing all of its rows.
+
+        Args:
+            data (Context or DataFrame): Current stock data.
+        """
+        self._context = data if data is None or isinstance(data, Context) else Context(data)
+        if data is not None:
+            self.data_version = None
+        if "_stocks" in self.__dict__:
+            # Binding rewrites the column of every position, which a fork must not do to its parent's
+            self._own_stocks()
+            self._stocks.bind(self._context)
 
     @autosave
+    @undoable
+    @profiled
     def deposit(self, value, trans_date=date.today()):
         """Deopsit new cash into a portfolio. Increases the buy power of a portfolio.
 
@@ -49,6 +262,8 @@ class Portfolio:
         self.log(transaction)
 
     @autosave
+    @undoable
+    @profiled
     def buy(self, ticker, num_shares, total_cost, trans_date=date.today()):
         """Buy a new stock using a portfolio's buy power.
 
@@ -61,7 +276,7 @@ class Portfolio:
         Raises:
             ValueError: When a portfolio doesn't have enough buy power to buy the desired stocks.
         """
-        stock_in_portfolio = next((s for s in self.stocks if s.ticker == ticker), None)
+        stock_in_portfolio = self.stocks.get(ticker)
 
         if round(self.buy_power - total_cost, 3) >= 0 :
             self.buy_power = self.buy_power - total_cost
@@ -69,8 +284,7 @@ class Portfolio:
             raise ValueError("Cannot buy stocks. Not enough buy power")
 
         if stock_in_portfolio is None:
-            stock = Stock(ticker, num_shares, total_cost)
-            self.stocks.append(stock)
+            self.stocks.add(ticker, num_shares, total_cost / num_shares)
         else:
             stock = stock_in_portfolio
             stock.avg_cost = (stock.avg_cost * stock.num_shares + total_cost) / (stock.num_shares + num_shares)
@@ -82,6 +296,8 @@ class Portfolio:
         self.log(transaction)
        
     @autosave
+    @undoable
+    @profiled
     def sell(self, ticker, num_shares, total_price, trans_date=date.today()):
         """Sell shares of a stock from a portfolio's stock list.
 
@@ -94,7 +310,7 @@ class Portfolio:
         Raises:
             ValueError: Cannot sell stocks that a portfolio doesn't own.
         """
-        stock_to_sell = next((s for s in self.stocks if s.ticker == ticker), None)
+        stock_to_sell = self.stocks.get(ticker)
         if stock_to_sell is not None:
             if round(stock_to_sell.num_shares - num_shares, 3) >= 0:
                 stock_to_sell.num_shares = stock_to_sell.num_shares - num_shares
@@ -112,6 +328,8 @@ class Portfolio:
         self.log(transaction)
 
     @autosave
+    @undoable
+    @profiled
     def sell_all(self, ticker, total_price, trans_date=date.today()):
         """[summary]
 
@@ -124,7 +342,7 @@ class Portfolio:
             ValueError: [description]
         """
         num_shares = self.get_numshares(ticker)
-        stock_to_sell = next((s for s in self.stocks if s.ticker == ticker), None)
+        stock_to_sell = self.stocks.get(ticker)
         if stock_to_sell is not None:
             stock_to_sell.num_shares = 0
             self.stocks.remove(stock_to_sell)
@@ -138,7 +356,9 @@ class Portfolio:
         self.log(transaction)
 
     @autosave
-    def dividend(self, ticker, amount, ex_dividend_date, trans_date=date.today()):
+    @undoable
+    @profiled
+    def dividend(self, ticker, amount, ex_dividend_date, trans_date=date.today(), factor=None):
         """Apply a stock dividend to a portfolio.
 
         Args:
@@ -146,17 +366,20 @@ class Portfolio:
             amount (number): Total dividend returned for owning a stock.
             ex_dividend_date (datetime): [description]
             trans_date (datetime, optional): [description]. Defaults to date.today().
+            factor (number, optional): Average cost adjustment factor, e.g. from CorporateActions.
+                Defaults to one derived from the close before "ex_dividend_date".
 
         Raises:
             ValueError: Must own a stock to get a dividend.
         """
-        dividend_stock = next((s for s in self.stocks if s.ticker == ticker), None)
+        dividend_stock = self.stocks.get(ticker)
         if dividend_stock is not None:
             self.buy_power = self.buy_power + amount
-            dividend_per_share = amount / dividend_stock.num_shares
-            pre_dividend_close = self.context["Close"][ticker][self.context.index.get_loc(ex_dividend_date)-1]
-            adj_factor = 1 - dividend_per_share / pre_dividend_close
-            dividend_stock.avg_cost = dividend_stock.avg_cost * adj_factor
+            if factor is None:
+                dividend_per_share = amount / dividend_stock.num_shares
+                pre_dividend_close = self.context.before(ticker, ex_dividend_date, "Close")
+                factor = 1 - dividend_per_share / pre_dividend_close
+            dividend_stock.avg_cost = dividend_stock.avg_cost * factor
         else:
             raise ValueError("Cannot get dividend on stock that you don't own")
 
@@ -164,13 +387,38 @@ class Portfolio:
         self.history.append(transaction)
         self.log(transaction)    
 
+    @autosave
+    @undoable
+    @profiled
+    def split(self, ticker, ratio, trans_date=date.today()):
+        """Apply a stock split to a portfolio. The shares are multiplied and the average cost divided by "ratio".
+
+        Args:
+            ticker (str): Stock Identifier
+            ratio (number): New shares per old share, e.g. 2 for a 2-for-1 split.
+            trans_date (datetime, optional): Date of the split. Defaults to date.today().
+
+        Raises:
+            ValueError: Must own a stock to split it.
+        """
+        split_stock = self.stocks.get(ticker)
+        if split_stock is not None:
+            split_stock.num_shares = split_stock.num_shares * ratio
+            split_stock.avg_cost = split_stock.avg_cost / ratio
+        else:
+            raise ValueError("Cannot split stock that you don't own")
+
+        transaction = SplitTransaction(trans_date, TransactionType.SPLIT, ratio, ticker)
+        self.history.append(transaction)
+        self.log(transaction)
+
     def get_numshares(self, ticker):
         """[summary]
 
         Returns:
             [type]: [description]
         """
-        stock = next((s for s in self.stocks if s.ticker == ticker), None)
+        stock = self.stocks.get(ticker)
         return stock.num_shares
 
     def max_holding(self):
@@ -179,24 +427,16 @@ class Portfolio:
         Returns:
             [type]: [description]
         """
-        max_holding = 0
-        for stock in self.stocks:
-            holding = stock.num_shares * self.context["Adj Close"][stock.ticker].iloc[-1]
-            if holding > max_holding:
-                max_holding = holding
-        return max_holding
+        return max(float(self.stocks.values(self.context).max()), 0) if len(self.stocks) else 0
 
+    @profiled
     def current_value(self):
         """Calculates the current value of a portfolio by looking up lastes prices for the stocks in the stock list.
 
         Returns:
             number: Current value of a portfolio
         """
-        stock_value = 0
-        for s in self.stocks:
-            price = self.context["Adj Close"][s.ticker].iloc[-1]
-            stock_value = stock_value + price * s.num_shares
-        return round(stock_value + self.buy_power, 3)
+        return round(self.stocks.value(self.context) + self.buy_power, 3)
 
     def market_current_value(self, index="^GSPC"):
         """Calculates the current value of a portfolio if all deposists were invested in the index. 
@@ -210,16 +450,17 @@ class Portfolio:
         """
         market_shares = 0
         for trans in self.history:
-            market_shares = market_shares + trans.get_deposit() / self.context["Adj Close"][index][trans.date]
-        return round(market_shares * self.context["Adj Close"][index].iloc[-1], 3)
+            market_shares = market_shares + trans.get_deposit() / self.context.price(index, trans.date)
+        return round(market_shares * self.context.latest(index), 3)
 
     def calc_rate_of_return(self):
-        """Calculates rate of return using an optimization package.
+        """Calculates the money-weighted rate of return of the deposits, see returns.rate_of_return.
 
         Returns:
             number: Rate of return of the portfolio.
         """
-        return round(opt.fsolve(lambda rate: self.value_diff(rate), 1)[0], 3)
+        amounts, years = cash_flows(self)
+        return round(rate_of_return(amounts, years, self.current_value()), 3)
     
     def calc_market_rate_of_return(self, index="^GSPC"):
         """Cacluates a rate of return for a naive market strategy.
@@ -230,41 +471,88 @@ class Portfolio:
         Returns:
             number: Rate of return for a portfolio using a naive strategy.
         """
-        return round(opt.fsolve(lambda rate: self.value_diff(rate, index), 1)[0], 3)
-
-    def value_diff(self, rate, index=None):
-        """Helper method to produce the rate of return equations.
+        amounts, years = cash_flows(self)
+        return round(rate_of_return(amounts, years, self.market_current_value(index)), 3)
 
-        Args:
-            rate (number): guess made by solving method.
-            index (str, optional): Index to buid rate of return for. Defaults to None.
-
-        Returns:
-            number: difference between value generated using guessed rate and a portfolios current value.
-        """
-        value = 0
-        for trans in self.history:
-            value = value + trans.get_deposit() * (rate ** ((date.today() - trans.date).days / 365))
-        return value - (self.current_value() if index is None else self.market_current_value(index))
-    
     def report(self):
         """Prints a report of a portfiolo.
         """
         print(f"Current Value = {self.current_value()}")
         print(f"Buy Power = {round(self.buy_power, 3)}")
         print("-" * 30)
-        self.stocks.sort(key = lambda x : x.num_shares * self.context["Adj Close"][x.ticker].iloc[-1], reverse = True)
+        self._own_stocks()
+        self.stocks.sort(key = lambda x : x.num_shares * self.context.latest(x.ticker), reverse = True)
         for s in self.stocks:
-            current_value = round(self.context["Adj Close"][s.ticker].iloc[-1], 3)
+            current_value = round(self.context.latest(s.ticker), 3)
             print(f"{s} {current_value}")
 
+    @property
+    def journal(self):
+        """Journal of autosaved operations, "name".journal."""
+        if self._journal is None:
+            self._journal = Journal(f"{self.name}.journal", flush_every=self.journal_flush_every)
+        return self._journal
+
+    def _journal_transaction(self, transaction):
+        record = transaction_record(transaction)
+        record["buy_power"] = self.buy_power
+        ticker = record.get("ticker")
+        if ticker is not None:
+            position = self._position(ticker)
+            record["position"] = None if position is None else list(position)
+        self._journal_record(record)
+
+    def _journal_record(self, record):
+        seq = self.journal.append(record)
+        if seq % self.snapshot_every == 0:
+            self.save()
+
+    def _apply_record(self, record):
+        """Replays one journal record: its transaction, or the undo of the last one, and the state it left the portfolio in."""
+        if record["type"] == "UNDO":
+            self.history.pop()
+        else:
+            self.history.append(record_transaction(record))
+        self.buy_power = record["buy_power"]
+        if record.get("ticker") is not None and "position" in record:
+            self._set_position(record["ticker"], record["position"])
+
+    def _saved_version(self, register=True):
+        """Data version to save with the portfolio. With "register", the context is registered so it can be reattached."""
+        context = self.__dict__.get("_context")
+        if context is None:
+            return self.data_version
+        if register:
+            register_context(context)
+        return context.version
+
+    @profiled
     def save(self):
-        """Saves a portfolio by dumping the object to a pickle file.
-        """
-        filename = f"{self.name}.pkl"
-        with open(filename, 'wb') as output:
-            pickle.dump(self, output, pickle.HIGHEST_PROTOCOL)
+        """Saves a portfolio as a snapshot, "name".snapshot, and flushes its journal.
 
+        The snapshot holds the state up to the latest journal record and the data version of the
+        price context instead of the prices.
+        """
+        seq = 0
+        if self._journal is not None or os.path.exists(f"{self.name}.journal"):
+            self.journal.flush()
+            seq = self.journal.seq
+        snapshot = {
+            "seq": seq,
+            "buy_power": self.buy_power,
+            "stocks": self.stocks,
+            "history": self.history,
+            "autosave": self.autosave,
+            "logging": self.logging,
+            "snapshot_every": self.snapshot_every,
+            "data_version": self._saved_version(),
+        }
+        filename = f"{self.name}.snapshot"
+        with open(filename + ".tmp", 'wb') as output:
+            pickle.dump(snapshot, output, pickle.HIGHEST_PROTOCOL)
+        os.replace(filename + ".tmp", filename)
+
+    @profiled
     def log(self, transaction):
         """Writes a message to a log file indicating a transaction that occurred.
 
@@ -272,25 +560,75 @@ class Portfolio:
             transaction (Transaction): Transaction that occurred on a portfolio.
         """
         if self.logging:
-            filename = f"{self.name}.log"
-            with open(filename, 'a') as logfile:
-                nl = '\n'
-                logfile.write(f"{transaction}{nl}")
+            if self._logfile is None:
+                self._logfile = open(f"{self.name}.log", 'a')
+            nl = '\n'
+            self._logfile.write(f"{transaction}{nl}")
+
+    def flush(self):
+        """Writes buffered journal records and log lines to disk."""
+        if self._journal is not None:
+            self._journal.flush()
+        if self._logfile is not None:
+            self._logfile.flush()
+
+    def close(self):
+        """Flushes and closes the journal and log files. They are reopened when needed."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self._logfile is not None:
+            self._logfile.close()
+            self._logfile = None
 
     @staticmethod
     def load(name, context=None):
-        """Loads a given portfolio by reading it from a pickle file.
+        """Loads a given portfolio from its last snapshot and the journal records written after it.
+        Portfolios saved as a whole, "name".pkl, are still read when there is no snapshot or journal.
+
+        Without "context", the data set the portfolio was saved with is attached on first use if it
+        is still registered (see register_context), and a ValueError is raised otherwise. A
+        "context" that is not the data set the portfolio was saved with, e.g. newer prices, is
+        attached with a warning.
 
         Args:
             name (str): Name of portfolio to open.
             context (Dataframe, optional): Curret stock prices to load into the portfolio. Defaults to None.
 
         Returns:
-            Portfolio: Portfolio object loaded from "name".pkl.
+            Portfolio: Portfolio object loaded from "name".snapshot and "name".journal.
         """
-        filename = f"{name}.pkl"
-        with open(filename, 'rb') as objfile:
-            portfolio =  pickle.load(objfile)
-            if context is not None:
-                portfolio.context = context
+        snapshot_file = f"{name}.snapshot"
+        journal_file = f"{name}.journal"
+        if not os.path.exists(snapshot_file) and not os.path.exists(journal_file):
+            filename = f"{name}.pkl"
+            with open(filename, 'rb') as objfile:
+                portfolio =  pickle.load(objfile)
+            Portfolio._attach(portfolio, context)
             return portfolio
+
+        portfolio = Portfolio(name, None)
+        seq = 0
+        if os.path.exists(snapshot_file):
+            with open(snapshot_file, 'rb') as objfile:
+                snapshot = pickle.load(objfile)
+            seq = snapshot.pop("seq")
+            for key, value in snapshot.items():
+                setattr(portfolio, key, value)
+        else:
+            # Only autosaved portfolios have a journal
+            portfolio.autosave = True
+        for record in Journal.read(journal_file, after=seq):
+            portfolio._apply_record(record)
+        Portfolio._attach(portfolio, context)
+        return portfolio
+
+    @staticmethod
+    def _attach(portfolio, context):
+        if context is None:
+            return
+        context = context if isinstance(context, Context) else Context(context)
+        if portfolio.data_version is not None and context.version != portfolio.data_version:
+            warnings.warn(f"Portfolio {portfolio.name} was saved with data version {portfolio.data_version}, "
+                          f"loading it with {context.version}", stacklevel=3)
+        portfolio.context = context
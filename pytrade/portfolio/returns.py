@@ -0,0 +1,102 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+
+
+def rate_of_return(amounts, years, values, guess=1.0, tol=1e-12, max_iter=100):
+    """Money-weighted rate of return: the yearly growth factor r with sum(amounts * r ** years) == values.
+
+    Solved with Newton's method on the analytic derivative, safeguarded by a bracket that falls
+    back to bisection whenever a Newton step would leave it. Every row is an independent
+    problem and all rows are solved together with array operations.
+
+    Args:
+        amounts (ndarray): Deposits, shaped (flows,) or (portfolios, flows). Pad unequal rows with 0.
+        years (ndarray): Years from each deposit to the valuation date, shaped like "amounts".
+        values (number or ndarray): Value of each portfolio on the valuation date.
+        guess (float, optional): Starting growth factor. Defaults to 1.0.
+        tol (float, optional): Relative tolerance on the growth factor. Defaults to 1e-12.
+        max_iter (int, optional): Iteration limit. Defaults to 100.
+
+    Returns:
+        float or ndarray: Growth factor per year (1.05 for 5%) of each portfolio. NaN where there is no
+            solution, e.g. nothing was deposited.
+    """
+    single = np.ndim(amounts) == 1
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=np.float64))
+    years = np.atleast_2d(np.asarray(years, dtype=np.float64))
+    values = np.broadcast_to(np.asarray(values, dtype=np.float64), amounts.shape[:1])
+
+    def value(rate):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (amounts * rate[:, None] ** years).sum(axis=1) - values
+
+    # With deposits only, the value grows with the rate, so the root is bracketed by a rate
+    # where it falls short and one where it overshoots
+    low = np.zeros(len(values))
+    high = np.full(len(values), 2.0)
+    for _ in range(64):
+        short = value(high) < 0
+        if not short.any():
+            break
+        low = np.where(short, high, low)
+        high = np.where(short, high * 2, high)
+    solvable = (value(low) <= 0) & (value(high) >= 0) & (amounts.sum(axis=1) > 0)
+
+    rate = np.clip(np.full(len(values), guess), low, high)
+    for _ in range(max_iter):
+        f = value(rate)
+        low = np.where(f < 0, rate, low)
+        high = np.where(f > 0, rate, high)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (amounts * years * rate[:, None] ** (years - 1)).sum(axis=1)
+            newton = rate - f / slope
+        inside = np.isfinite(newton) & (newton > low) & (newton < high)
+        step = np.where(inside, newton, (low + high) / 2)
+        done = (np.abs(step - rate) <= tol * np.maximum(np.abs(rate), 1)) | (f == 0)
+        rate = np.where(f == 0, rate, step)
+        if done.all():
+            break
+
+    rate = np.where(solvable, rate, np.nan)
+    return float(rate[0]) if single else rate
+
+
+def cash_flows(portfolio, today=None):
+    """Deposits of a portfolio and the years from each one to "today", as arrays.
+
+    Args:
+        portfolio (Portfolio): Portfolio to read the history of.
+        today (date, optional): Valuation date. Defaults to date.today().
+
+    Returns:
+        tuple: (amounts, years) ndarrays.
+    """
+    today = date.today() if today is None else today
+    deposits = [(trans.get_deposit(), trans.date) for trans in portfolio.history if trans.get_deposit() != 0]
+    amounts = np.array([amount for amount, _ in deposits], dtype=np.float64)
+    days = np.array([(today - pd.Timestamp(trans_date).date()).days for _, trans_date in deposits], dtype=np.float64)
+    return amounts, days / 365
+
+
+def rates_of_return(portfolios, index=None, today=None):
+    """Money-weighted rates of return of many portfolios in one vectorized solve.
+
+    Args:
+        portfolios (list): Portfolios with a price context.
+        index (str, optional): Value each portfolio as if every deposit had been invested in this index,
+            like Portfolio.calc_market_rate_of_return. Defaults to None.
+        today (date, optional): Valuation date. Defaults to date.today().
+
+    Returns:
+        ndarray: Growth factor per year of each portfolio.
+    """
+    flows = [cash_flows(portfolio, today) for portfolio in portfolios]
+    width = max([len(amounts) for amounts, _ in flows], default=0)
+    amounts = np.zeros((len(flows), width))
+    years = np.zeros((len(flows), width))
+    for i, (a, y) in enumerate(flows):
+        amounts[i, :len(a)] = a
+        years[i, :len(y)] = y
+    values = [p.current_value() if index is None else p.market_current_value(index) for p in portfolios]
+    return rate_of_return(amounts, years, values)
@@ -1,8 +1,59 @@
 class Stock:
+    """Position in one stock.
+
+    A Stock either holds its own values (e.g. the stock of a transaction) or is a view of one
+    row of a Holdings store, reading and writing the shares and average cost there.
+    """
+    __slots__ = ("ticker", "_holdings", "_row", "_num_shares", "_avg_cost")
+
     def __init__(self, ticker, num_shares, total_cost):
         self.ticker = ticker
-        self.num_shares = num_shares
-        self.avg_cost = total_cost / num_shares
+        self._holdings = None
+        self._row = -1
+        self._num_shares = num_shares
+        self._avg_cost = total_cost / num_shares
+
+    @property
+    def num_shares(self):
+        return self._num_shares if self._holdings is None else float(self._holdings.shares[self._row])
+
+    @num_shares.setter
+    def num_shares(self, value):
+        if self._holdings is None:
+            self._num_shares = value
+        else:
+            self._holdings.shares[self._row] = value
+
+    @property
+    def avg_cost(self):
+        return self._avg_cost if self._holdings is None else float(self._holdings.avg_cost[self._row])
+
+    @avg_cost.setter
+    def avg_cost(self, value):
+        if self._holdings is None:
+            self._avg_cost = value
+        else:
+            self._holdings.avg_cost[self._row] = value
+
+    def _detach(self):
+        """Keeps the current values and stops viewing the holdings store."""
+        self._num_shares = self.num_shares
+        self._avg_cost = self.avg_cost
+        self._holdings = None
+        self._row = -1
+
+    def __getstate__(self):
+        return {"ticker": self.ticker, "num_shares": self.num_shares, "avg_cost": self.avg_cost}
+
+    def __setstate__(self, state):
+        # Also reads Stocks pickled before __slots__, whose state is the same dict
+        if isinstance(state, tuple):
+            state = state[1]
+        self.ticker = state["ticker"]
+        self._holdings = None
+        self._row = -1
+        self._num_shares = state["num_shares"]
+        self._avg_cost = state["avg_cost"]
 
     def __str__(self):
-        return f"{self.ticker}: {self.num_shares} @ {round(self.avg_cost, 3)}"
\ No newline at end of file
+        return f"{self.ticker}: {self.num_shares} @ {round(self.avg_cost, 3)}"
@@ -5,6 +5,7 @@ class TransactionType(Enum):
     SELL = "SELL"
     DEPOSIT = "DEPOSIT"
     DIVIDEND = "DIVIDEND"
+    SPLIT = "SPLIT"
 
 class Transaction:
     def __init__(self, date, transaction_type):
@@ -57,4 +58,19 @@ class DividendTransaction(Transaction):
         return 0
 
     def __str__(self):
-        return f"{self.type.name} {self.date} {self.ticker} {self.dividend}"
\ No newline at end of file
+        return f"{self.type.name} {self.date} {self.ticker} {self.dividend}"
+
+
+class SplitTransaction(Transaction):
+    def __init__(self, date, transaction_type, ratio, ticker):
+        if transaction_type != TransactionType.SPLIT:
+            raise ValueError("Bad Transaction type")
+        Transaction.__init__(self, date, transaction_type)
+        self.ratio = ratio
+        self.ticker = ticker
+
+    def get_deposit(self):
+        return 0
+
+    def __str__(self):
+        return f"{self.type.name} {self.date} {self.ticker} {self.ratio}"
\ No newline at end of file
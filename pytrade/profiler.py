@@ -0,0 +1,122 @@
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+
+
+def profiled(func):
+    """Decorator that times a method in the profiler of its object, named "<class>.<method>".
+
+    Objects opt in by setting their "profiler" attribute. While it is None the method runs
+    directly, so a disabled profiler only costs an attribute lookup per call.
+
+    Args:
+        func (function): Method to wrap.
+    """
+    @functools.wraps(func)
+    def profiled_wrapper(self, *args, **kwargs):
+        profiler = self.profiler
+        if profiler is None:
+            return func(self, *args, **kwargs)
+        with profiler.phase(f"{type(self).__name__}.{func.__name__}"):
+            return func(self, *args, **kwargs)
+    return profiled_wrapper
+
+
+class Profiler:
+    """Wall time, call counts and allocations per phase of a run.
+
+    Phases nest: "total_seconds" of a phase includes the phases called inside it and
+    "self_seconds" excludes them, so the self times of all phases add up to the profiled time.
+    """
+    def __init__(self, memory=False, trace=False):
+        """Profiler initializer.
+
+        Args:
+            memory (bool, optional): Record the bytes allocated per phase with tracemalloc. Slows the run
+                down considerably. Defaults to False.
+            trace (bool, optional): Keep every call as an event for export. Defaults to False.
+        """
+        self.memory = memory
+        self.trace = trace
+        self.stats = {} # Phase name to [calls, total seconds, self seconds, allocated bytes]
+        self.events = [] # (phase name, start, duration) of every call when tracing
+        self._children = [] # Time spent in nested phases, one entry per open phase
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = memory and not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name):
+        """Records the time and allocations of the enclosed block under "name"."""
+        allocated = tracemalloc.get_traced_memory()[0] if self.memory else 0
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = [0, 0.0, 0.0, 0]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += elapsed - children
+            if self.memory:
+                stats[3] += tracemalloc.get_traced_memory()[0] - allocated
+            if self.trace:
+                self.events.append((name, start - self._origin, elapsed))
+
+    def call(self, obj, method, *args, **kwargs):
+        """Calls obj.method(*args, **kwargs) as the phase "<class>.<method>"."""
+        with self.phase(f"{type(obj).__name__}.{method}"):
+            return getattr(obj, method)(*args, **kwargs)
+
+    def stop(self):
+        """Stops tracemalloc if this profiler started it."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def clear(self):
+        self.stats.clear()
+        self.events.clear()
+
+    def summary(self):
+        """Statistics of every phase, most expensive (by self time) first.
+
+        Returns:
+            DataFrame: calls, total_seconds, self_seconds, mean_seconds, share (of all self time) and
+                allocated_bytes (net, only recorded with memory=True) indexed by phase.
+        """
+        summary = pd.DataFrame.from_dict(self.stats, orient="index",
+                                         columns=["calls", "total_seconds", "self_seconds", "allocated_bytes"])
+        summary["mean_seconds"] = summary["total_seconds"] / summary["calls"]
+        summary["share"] = summary["self_seconds"] / summary["self_seconds"].sum()
+        summary.index.name = "phase"
+        return summary[["calls", "total_seconds", "self_seconds", "mean_seconds", "share", "allocated_bytes"]] \
+            .sort_values("self_seconds", ascending=False)
+
+    def export(self, filename):
+        """Writes the recorded calls in the Chrome trace event format (chrome://tracing, Perfetto).
+
+        Args:
+            filename (str): Output JSON file.
+
+        Raises:
+            ValueError: The profiler was created without trace=True.
+        """
+        if not self.trace:
+            raise ValueError("Profiler was created without trace=True, there are no events to export")
+        events = [{"name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": 0, "tid": 0}
+                  for name, start, duration in self.events]
+        summary = {name: dict(zip(["calls", "total_seconds", "self_seconds", "allocated_bytes"], stats))
+                   for name, stats in self.stats.items()}
+        with open(filename, "w") as output:
+            json.dump({"traceEvents": events, "otherData": {"summary": summary}}, output)
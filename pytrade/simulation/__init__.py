@@ -1 +1,7 @@
-from .simulation import *
\ No newline at end of file
+from .simulation import *
+from .sweep import *
+from .vectorized import *
+from .result import *
+from .walkforward import *
+from .multi import *
+from .scenarios import *
@@ -0,0 +1,134 @@
+import datetime
+import pandas as pd
+from ..context import Context
+from ..data import data_version
+from ..trading_calendar import to_day
+from .simulation import Simulation
+from .result import SimulationResult
+
+
+class MultiSimulation:
+    """Runs several strategies in one pass over the calendar, each on its own sub-portfolio.
+
+    Every strategy is wrapped in a Simulation, but all of them read the same Context, which is
+    advanced once per trading day. The per-day data preparation (seeking the context, building
+    the analysis frames that analysis_cache shares between strategies) is therefore paid once
+    instead of once per strategy.
+    """
+    def __init__(self, context, buy_power, strategies, start_date, end_date=datetime.date.today(), name="",
+                 verbose=True, version=None, benchmark="^GSPC", actions=None):
+        """MultiSimulation initializer.
+
+        Args:
+            context (DataFrame or Context): Full data set for simulation.
+            buy_power (number or list): Cash split equally amongst the strategies, or the cash of each strategy.
+            strategies (list): Strategy objects. Each one trades its own sub-portfolio.
+            start_date (date): First day of the simulation.
+            end_date (date, optional): Last day of the simulation. Defaults to date.today().
+            name (str, optional): Prefix of the sub-portfolio names. Defaults to "".
+            verbose (bool, optional): Print portfolio reports. Defaults to True.
+            version (str, optional): data_version of context, if already known. Defaults to None.
+            benchmark (str, optional): Index the equity curves are compared against. Defaults to "^GSPC".
+            actions (CorporateActions, optional): Dividends and splits applied to every sub-portfolio. Defaults to None.
+
+        Raises:
+            ValueError: Strategy names are not unique, or "buy_power" does not have one entry per strategy.
+        """
+        names = [strategy.name for strategy in strategies]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Strategy names must be unique, got {names}")
+        if isinstance(buy_power, (list, tuple)):
+            if len(buy_power) != len(strategies):
+                raise ValueError(f"{len(buy_power)} buy powers given for {len(strategies)} strategies")
+            amounts = list(buy_power)
+        else:
+            amounts = [buy_power / len(strategies)] * len(strategies)
+
+        self.name = name
+        self.context = context
+        self.start_date = start_date
+        self.end_date = end_date
+        self.verbose = verbose
+        self.version = version
+        self.simulations = {
+            strategy.name: Simulation(context, amount, strategy, start_date, end_date, name=f"{name}{strategy.name}",
+                                      verbose=verbose, version=version, benchmark=benchmark,
+                                      actions=actions)
+            for strategy, amount in zip(strategies, amounts)
+        }
+        for simulation in self.simulations.values():
+            simulation._portfolio.logging = False
+        self.results = None # Strategy name to SimulationResult, available after run
+
+    @property
+    def data(self):
+        """Full data set as a DataFrame."""
+        return self.context.data if isinstance(self.context, Context) else self.context
+
+    @property
+    def portfolios(self):
+        """Strategy name to sub-portfolio."""
+        return {name: simulation.portfolio for name, simulation in self.simulations.items()}
+
+    def run(self):
+        """Runs every strategy over the simulation period.
+
+        Returns:
+            dict: Strategy name to sub-portfolio.
+        """
+        if self.version is None:
+            self.version = data_version(self.data)
+        shared = self.context.as_of(0) if isinstance(self.context, Context) else Context(self.context)
+        for simulation in self.simulations.values():
+            simulation.strategy.prepare(self.data, self.version)
+            simulation.initialize(shared)
+
+        calendar = shared.calendar
+        position = calendar.position(self.start_date)
+        end_position = calendar.position(self.end_date) if to_day(self.start_date) <= to_day(self.end_date) else position - 1
+        for simulation in self.simulations.values():
+            simulation._start_recording(position, end_position)
+
+        current_date = self.start_date
+        while position <= end_position:
+            shared.seek(position)
+            for simulation in self.simulations.values():
+                simulation._step(current_date)
+                simulation._record(position)
+            position += 1
+            if position >= len(calendar):
+                break
+            current_date = calendar.date(position)
+
+        self.results = {}
+        for name, simulation in self.simulations.items():
+            simulation._finish_recording(position)
+            simulation.portfolio.flush()
+            self.results[name] = simulation.result
+        if self.verbose:
+            print("Finished Simulation")
+            print(self.report())
+        return self.portfolios
+
+    def report(self):
+        """Final value, return and statistics of every sub-portfolio and of the combined book.
+
+        Returns:
+            DataFrame: One row per strategy plus a "total" row.
+        """
+        report = SimulationResult.compare(self.results.values())
+        report.index = list(self.results)
+        report.loc["total"] = pd.Series(self.combined().summary())
+        return report.drop(columns="name", errors="ignore")
+
+    def combined(self):
+        """Equity curve of the whole book, the sum of the sub-portfolios.
+
+        Returns:
+            SimulationResult: Combined result.
+        """
+        results = list(self.results.values())
+        first = results[0]
+        return SimulationResult(self.name or "total", first.dates, sum(r.value for r in results),
+                                sum(r.cash for r in results), sum(r.invested for r in results),
+                                sum(r.benchmark for r in results), sum(r.transactions for r in results))
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+from ..portfolio import rate_of_return
+
+
+class SimulationResult:
+    """Daily equity curve of a simulation with the performance statistics derived from it.
+
+    Holds one array per series (portfolio value, cash, invested value and the value of the
+    deposits had they been invested in the benchmark index) and saves to a single .npz file.
+    """
+    SERIES = ["value", "cash", "invested", "benchmark"]
+
+    def __init__(self, name, dates, value, cash, invested, benchmark, transactions=0):
+        """SimulationResult initializer.
+
+        Args:
+            name (str): Simulation name.
+            dates (DatetimeIndex): Simulated trading days.
+            value (ndarray): Portfolio value per day.
+            cash (ndarray): Buy power per day.
+            invested (ndarray): Value of the stock holdings per day.
+            benchmark (ndarray): Value of the deposits invested in the benchmark index per day.
+            transactions (int, optional): Number of buys and sells. Defaults to 0.
+        """
+        self.name = name
+        self.dates = pd.DatetimeIndex(dates)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.cash = np.asarray(cash, dtype=np.float64)
+        self.invested = np.asarray(invested, dtype=np.float64)
+        self.benchmark = np.asarray(benchmark, dtype=np.float64)
+        self.transactions = transactions
+
+    def __len__(self):
+        return len(self.dates)
+
+    def returns(self, series="value"):
+        """Daily simple returns of a series."""
+        values = getattr(self, series)
+        return values[1:] / values[:-1] - 1
+
+    def drawdown(self, series="value"):
+        """Fraction below the running peak on each day (0 at a new high, negative below it)."""
+        values = getattr(self, series)
+        return values / np.maximum.accumulate(values) - 1
+
+    def max_drawdown(self, series="value"):
+        return float(self.drawdown(series).min()) if len(self) else 0.0
+
+    def time_under_water(self, series="value"):
+        """Longest run of trading days spent below a previous peak."""
+        under = self.drawdown(series) < 0
+        days = np.arange(len(under))
+        last_peak = np.maximum.accumulate(np.where(under, -1, days))
+        return int((days - last_peak).max()) if len(under) else 0
+
+    def volatility(self, series="value", periods=252):
+        """Annualized standard deviation of daily returns."""
+        returns = self.returns(series)
+        return float(np.std(returns, ddof=1) * np.sqrt(periods)) if len(returns) > 1 else 0.0
+
+    def sharpe(self, series="value", risk_free=0.0, periods=252):
+        """Annualized Sharpe ratio of daily returns against an annual risk free rate."""
+        excess = self.returns(series) - risk_free / periods
+        if len(excess) < 2 or np.std(excess, ddof=1) == 0:
+            return 0.0
+        return float(np.mean(excess) / np.std(excess, ddof=1) * np.sqrt(periods))
+
+    def total_return(self, series="value"):
+        values = getattr(self, series)
+        return float(values[-1] / values[0] - 1) if len(values) else 0.0
+
+    def rate_of_return(self, series="value"):
+        """Yearly growth factor of a series, as Portfolio.calc_rate_of_return gives for a single deposit."""
+        return float(SimulationResult.rates_of_return([self], series)[0])
+
+    @staticmethod
+    def rates_of_return(results, series="value"):
+        """Yearly growth factors of many results in one vectorized solve.
+
+        Args:
+            results (list): SimulationResult objects.
+            series (str, optional): Series to measure, e.g. "benchmark". Defaults to "value".
+
+        Returns:
+            ndarray: Growth factor per year (1.05 for 5%) of each result.
+        """
+        first = np.array([getattr(r, series)[0] if len(r) else np.nan for r in results])
+        last = np.array([getattr(r, series)[-1] if len(r) else np.nan for r in results])
+        years = np.array([(r.dates[-1] - r.dates[0]).days / 365 if len(r) else 0 for r in results])
+        return rate_of_return(first[:, None], years[:, None], last)
+
+    def summary(self):
+        """Headline statistics of the portfolio and the benchmark.
+
+        Returns:
+            dict: Statistic name to value.
+        """
+        return {
+            "name": self.name,
+            "days": len(self),
+            "final_value": float(self.value[-1]) if len(self) else np.nan,
+            "total_return": self.total_return(),
+            "benchmark_return": self.total_return("benchmark"),
+            "max_drawdown": self.max_drawdown(),
+            "time_under_water": self.time_under_water(),
+            "volatility": self.volatility(),
+            "sharpe": self.sharpe(),
+            "transactions": self.transactions,
+        }
+
+    def to_frame(self):
+        return pd.DataFrame({s: getattr(self, s) for s in self.SERIES}, index=self.dates)
+
+    def save(self, filename):
+        """Saves the result to a compressed .npz file."""
+        np.savez_compressed(filename, name=self.name, dates=self.dates.values.astype("datetime64[ns]"),
+                            transactions=self.transactions, **{s: getattr(self, s) for s in self.SERIES})
+
+    @staticmethod
+    def load(filename):
+        """Loads a result written by "save".
+
+        Returns:
+            SimulationResult: Loaded result.
+        """
+        with np.load(filename) as data:
+            return SimulationResult(str(data["name"]), data["dates"], data["value"], data["cash"], data["invested"],
+                                    data["benchmark"], int(data["transactions"]))
+
+    @staticmethod
+    def compare(results):
+        """Summaries of several results side by side.
+
+        Args:
+            results (list): SimulationResult objects.
+
+        Returns:
+            DataFrame: One row per result.
+        """
+        return pd.DataFrame([r.summary() for r in results]).set_index("name")
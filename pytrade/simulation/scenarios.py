@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from ..cache import analysis_cache, state_cache
+from ..extrema import WINDOWS
+from ..trading_calendar import TradingCalendar
+from .simulation import Simulation
+from .result import SimulationResult
+
+
+class ScenarioGenerator:
+    """Synthetic continuations of a price history for robustness runs.
+
+    The daily log returns of "Adj Close" up to "start" are the model: paths are either block
+    bootstrapped from them or drawn from a geometric Brownian motion with their mean and
+    covariance, optionally with regime shifts. Paths are generated in batches of "chunk"
+    scenarios so memory stays bounded by chunk x length x tickers. Every scenario is a context
+    (history up to "start", or the part of it a lookback needs, followed by the synthetic days)
+    that a Simulation can run on.
+    """
+    def __init__(self, context, start, seed=None, field="Adj Close"):
+        """ScenarioGenerator initializer.
+
+        Args:
+            context (DataFrame): Full data set with (field, ticker) MultiIndex columns.
+            start (date): Last historical day. Returns after it are never used.
+            seed (int, optional): Seed of the random generator. Defaults to None.
+            field (str, optional): Price field the returns are taken from. Defaults to "Adj Close".
+
+        Raises:
+            ValueError: Fewer than two rows of history before "start".
+        """
+        calendar = TradingCalendar(context.index)
+        end = calendar.position(start) + 1
+        if end < 2:
+            raise ValueError(f"Not enough history before {start} to estimate returns")
+        self.field = field
+        self.calendar = calendar
+        self.history = context.iloc[:end]
+        self.tickers = context[field].columns
+        prices = self.history[field].to_numpy(dtype=np.float64)
+        self.last = prices[-1]
+        # Missing prices (e.g. before a listing) contribute flat returns
+        self.returns = np.nan_to_num(np.diff(np.log(prices), axis=0))
+        self.mean = self.returns.mean(axis=0)
+        self.cov = np.atleast_2d(np.cov(self.returns, rowvar=False))
+        # Price level of every other field relative to "field" on the last day
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.scale = {f: self.history[f].to_numpy(dtype=np.float64)[-1] / self.last
+                          for f in dict.fromkeys(context.columns.get_level_values(0))}
+        self.rng = np.random.default_rng(seed)
+
+    def _bootstrap(self, k, length, block):
+        count = -(-length // block)
+        starts = self.rng.integers(0, max(len(self.returns) - block, 0) + 1, size=(k, count))
+        rows = (starts[:, :, None] + np.arange(block)).reshape(k, -1)[:, :length]
+        return self.returns[np.minimum(rows, len(self.returns) - 1)]
+
+    def _gbm(self, k, length):
+        # Square root of the covariance that tolerates singular (e.g. constant) columns
+        w, v = np.linalg.eigh(self.cov)
+        root = v * np.sqrt(np.clip(w, 0, None))
+        z = self.rng.standard_normal((k, length, len(self.mean)))
+        return self.mean + z @ root.T
+
+    def _regimes(self, returns, regimes, switch):
+        k, length, _ = returns.shape
+        changes = self.rng.random((k, length)) < switch
+        steps = np.where(changes, self.rng.integers(1, len(regimes), size=(k, length)), 0) if len(regimes) > 1 else 0
+        state = np.cumsum(steps, axis=1) % len(regimes)
+        drift = np.array([r[0] for r in regimes], dtype=np.float64)[state]
+        vol = np.array([r[1] for r in regimes], dtype=np.float64)[state]
+        return self.mean + (returns - self.mean) * vol[:, :, None] + drift[:, :, None]
+
+    def paths(self, n, length, method="bootstrap", block=20, regimes=None, switch=0.01, chunk=64):
+        """Generates synthetic price paths, "chunk" scenarios at a time.
+
+        Args:
+            n (int): Number of scenarios.
+            length (int): Trading days per scenario.
+            method (str, optional): "bootstrap" or "gbm". Defaults to "bootstrap".
+            block (int, optional): Block length of the bootstrap in trading days. Defaults to 20.
+            regimes (list, optional): (daily log drift, volatility multiplier) per regime. Paths start in
+                the first regime and switch to another one with probability "switch" per day. Defaults to None.
+            switch (float, optional): Daily probability of a regime shift. Defaults to 0.01.
+            chunk (int, optional): Scenarios per batch. Defaults to 64.
+
+        Raises:
+            ValueError: Unknown method.
+
+        Yields:
+            ndarray: Scenarios x days x tickers prices continuing from the last historical day.
+        """
+        if method not in ("bootstrap", "gbm"):
+            raise ValueError(f"Unknown scenario method {method}")
+        for first in range(0, n, chunk):
+            k = min(chunk, n - first)
+            returns = self._bootstrap(k, length, block) if method == "bootstrap" else self._gbm(k, length)
+            if regimes:
+                returns = self._regimes(returns, regimes, switch)
+            yield self.last * np.exp(np.cumsum(returns, axis=1))
+
+    def context(self, path, lookback=None):
+        """Data set of one scenario: the history followed by "path" on the next business days.
+
+        Args:
+            path (ndarray): Days x tickers prices, one scenario of "paths".
+            lookback (int, optional): Calendar days of history before the last historical day to keep,
+                e.g. the longest analysis window. Defaults to all of it.
+
+        Returns:
+            DataFrame: Same columns as the original data set.
+        """
+        first = 0 if lookback is None else self.calendar.window_start(self.history.index[-1], lookback)
+        history = self.history.iloc[first:]
+        dates = pd.bdate_range(history.index[-1], periods=len(path) + 1)[1:]
+        columns = history.columns
+        values = np.empty((len(history) + len(path), len(columns)))
+        values[:len(history)] = history.to_numpy(dtype=np.float64)
+        for field, scale in self.scale.items():
+            at = columns.get_locs([field])
+            values[len(history):, at] = path * scale if field != self.field else path
+        return pd.DataFrame(values, index=history.index.append(dates), columns=columns)
+
+    def scenarios(self, n, length, lookback=None, **kwargs):
+        """Yields the data set of every scenario, see context for "lookback" and paths for the other arguments."""
+        for batch in self.paths(n, length, **kwargs):
+            for path in batch:
+                yield self.context(path, lookback)
+
+
+def run_scenarios(generator, strategy_class, buy_power, n, length, benchmark="^GSPC",
+                  lookback=max(WINDOWS.values()), **kwargs):
+    """Runs a strategy on every scenario of "generator", from the last historical day to the end of the path.
+
+    Each scenario only carries the history its analysis windows reach back to, and its cached
+    analysis is evicted once it has run, so memory does not grow with the number of scenarios.
+
+    Args:
+        generator (ScenarioGenerator): Scenario source.
+        strategy_class (type): Strategy to run. A new instance is made per scenario.
+        buy_power (number): Starting cash.
+        n (int): Number of scenarios.
+        length (int): Trading days per scenario.
+        benchmark (str, optional): Index the equity curves are compared against. Defaults to "^GSPC".
+        lookback (int, optional): Calendar days of history kept before the first simulated day. Defaults to
+            the longest analysis window.
+        **kwargs: Passed to ScenarioGenerator.paths.
+
+    Returns:
+        DataFrame: SimulationResult.summary of every scenario, one row each. Use describe() or quantile()
+            for the distribution.
+    """
+    start = generator.history.index[-1]
+    results = []
+    for i, context in enumerate(generator.scenarios(n, length, lookback, **kwargs)):
+        simulation = Simulation(context, buy_power, strategy_class(f"scenario_{i}"), start, context.index[-1],
+                                name=f"scenario_{i}", verbose=False, benchmark=benchmark)
+        simulation._portfolio.logging = False
+        simulation.run()
+        results.append(simulation.result)
+        # No other run shares this scenario's data
+        state_cache.discard(simulation.strategy.version)
+        analysis_cache.discard(simulation.strategy.version)
+    return SimulationResult.compare(results)
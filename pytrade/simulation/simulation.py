@@ -1,10 +1,20 @@
 import datetime
+import pickle
 from ..strategy import Strategy
-from ..portfolio import Portfolio
+from ..portfolio import Portfolio, TransactionType
+from ..context import Context
+from ..corporate_actions import DIVIDEND
+from ..data import data_version
+from ..profiler import profiled
+from ..trading_calendar import to_day
+import numpy as np
 import pandas as pd
+from .result import SimulationResult
 
 class Simulation:
-    def __init__(self, context, buy_power, strategy, start_date, end_date = datetime.date.today(), name=""):
+    def __init__(self, context, buy_power, strategy, start_date, end_date = datetime.date.today(), name="", verbose=True, version=None,
+                 benchmark="^GSPC", checkpoint=None, checkpoint_every=20, profiler=None,
+                 actions=None):
         """Simulation initialization
 
         Args:
@@ -12,7 +22,15 @@ class Simulation:
             start_date ([type]): [description]
             end_date ([type], optional): [description]. Defaults to date.today().
             strategy (Strategy): Strategy to run the simulation.
-            context: (Dataframe): Full data set for simulation
+            context: (Dataframe or Context): Full data set for simulation. A Context is shared, not rebuilt.
+            verbose (bool, optional): Print portfolio reports. Defaults to True.
+            version (str, optional): data_version of context, if already known. Defaults to None.
+            benchmark (str, optional): Index the equity curve is compared against. Defaults to "^GSPC".
+            checkpoint (str, optional): File to append checkpoints to, see resume. Defaults to None.
+            checkpoint_every (int, optional): Trading days between checkpoints. Defaults to 20.
+            profiler (Profiler, optional): Records the time spent in each phase of the run. Defaults to None.
+            actions (CorporateActions, optional): Dividends and splits applied to the holdings. Only pass events
+                the price data is not already adjusted for. Defaults to None.
         """
         self.name = name
         # rename simulation buy power
@@ -21,64 +39,273 @@ class Simulation:
         self.start_date = start_date
         self.end_date = end_date
         self.context = context
+        self.verbose = verbose
+        self.version = version
+        self.benchmark = benchmark
+        self.result = None # SimulationResult, available after run
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.profiler = profiler
+        self.actions = actions
         # Enable passing in portfolio as initial starting point
         self._portfolio = Portfolio(name, None)
     
     def run(self):
-        # Initialize Portfolio
-        self.initialize()
+        # The profiler only times this run, the strategy and portfolio get their own back afterwards
+        previous = (self.strategy.profiler, self._portfolio.profiler)
+        if self.profiler is not None:
+            self.strategy.profiler = self.profiler
+            self._portfolio.profiler = self.profiler
+        try:
+            # Precompute analysis state over the full context
+            self.strategy.prepare(self.data, self.version)
 
-        current_date = self.start_date
+            # Initialize Portfolio
+            self.initialize()
+
+            calendar = self._context.calendar
+            current_date = self.start_date
+            position = calendar.position(self.start_date)
+            end_position = calendar.position(self.end_date) if to_day(self.start_date) <= to_day(self.end_date) else position - 1
+            self._start_recording(position, end_position)
+            if self.checkpoint is not None:
+                self._write_checkpoint_header()
+
+            return self._simulate(position, end_position, current_date)
+        finally:
+            self.strategy.profiler, self._portfolio.profiler = previous
+
+    def _simulate(self, position, end_position, current_date):
+        calendar = self._context.calendar
 
         # Run Simulation
-        while(current_date <= self.end_date):
+        while(position <= end_position):
             # print(current_date)
             # Update portfolio context with new date's data
-            current_date_mask = current_date >= self.context.index.date
-            self._portfolio.context = pd.DataFrame(self.context[current_date_mask])
-            to_sell = self.strategy.to_sell(self._portfolio)
-            for stock in to_sell:
-                name = stock[0]
-                percentage = stock[1]
-                num_shares = self._portfolio.get_numshares(name) * percentage
-                total_price = self._portfolio.context["Adj Close"][name].iloc[-1] * num_shares
-                self._portfolio.sell(name, num_shares, total_price, current_date)
-
-            # Add dividend logic
-
-            if round(self._portfolio.buy_power, 3) != 0:
-                to_buy = self.strategy.to_buy(self._portfolio)
-                amount_buy = self._portfolio.buy_power
-                for stock in to_buy:
-                    name = stock[0]
-                    percentage = stock[1]
-                    price = self._portfolio.context["Adj Close"][name].iloc[-1]
-                    num_shares = (amount_buy / price) * percentage
-                    self._portfolio.buy(name, num_shares, amount_buy * percentage, current_date)
-
-            if len(self.context.index) <= (self.context.index.get_loc(current_date) + 1):
+            self._context.seek(position)
+            self._step(current_date)
+            self._record(position)
+            position += 1
+            if position >= len(calendar):
                 break
-            current_date = self.context.index[self.context.index.get_loc(current_date) + 1]
+            current_date = calendar.date(position)
+            if self.checkpoint is not None and (position - self._first) % self.checkpoint_every == 0:
+                self._write_checkpoint(position, current_date)
 
-        print("Finished Simulation")
-        print(self._portfolio.report())
+        self._finish_recording(position)
+        self._portfolio.flush()
+        if self.verbose:
+            print("Finished Simulation")
+            print(self._portfolio.report())
+            if self.profiler is not None:
+                print(self.profiler.summary())
         return self._portfolio
         # Do something with results.
+
+    @profiled
+    def _step(self, current_date):
+        """Trades one day. The context must already be on "current_date"."""
+        if self.actions is not None:
+            self._apply_actions(self._context.position, current_date)
+
+        profiler = self.profiler
+        to_sell = self.strategy.to_sell(self._portfolio) if profiler is None else \
+            profiler.call(self.strategy, "to_sell", self._portfolio)
+        for stock in to_sell:
+            name = stock[0]
+            percentage = stock[1]
+            num_shares = self._portfolio.get_numshares(name) * percentage
+            total_price = self._context.latest(name) * num_shares
+            self._portfolio.sell(name, num_shares, total_price, current_date)
+
+        if round(self._portfolio.buy_power, 3) != 0:
+            to_buy = self.strategy.to_buy(self._portfolio) if profiler is None else \
+                profiler.call(self.strategy, "to_buy", self._portfolio)
+            amount_buy = self._portfolio.buy_power
+            for stock in to_buy:
+                name = stock[0]
+                percentage = stock[1]
+                price = self._context.latest(name)
+                num_shares = (amount_buy / price) * percentage
+                self._portfolio.buy(name, num_shares, amount_buy * percentage, current_date)
     
-    def initialize(self):
+    @profiled
+    def _apply_actions(self, position, current_date):
+        """Applies the day's dividends and splits of held stocks, with their precomputed cost factors."""
+        events = self.actions.on(position)
+        if not events:
+            return
+        held = {stock.ticker: stock for stock in self._portfolio.stocks}
+        for ticker, action, value, factor, ex_date in events:
+            stock = held.get(ticker)
+            if stock is None:
+                continue
+            if action == DIVIDEND:
+                self._portfolio.dividend(ticker, value * stock.num_shares, ex_date, current_date, factor)
+            else:
+                self._portfolio.split(ticker, value, current_date)
+
+    @profiled
+    def initialize(self, context=None):
         self._portfolio.deposit(self.buy_power, self.start_date)
 
-        start_date_mask = self.start_date >= self.context.index.date
-        self._portfolio.context = pd.DataFrame(self.context[start_date_mask])
+        # Portfolio and strategies see the context through a view that ends on the current date
+        if context is not None:
+            self._context = context
+        else:
+            self._context = self.context.as_of(0) if isinstance(self.context, Context) else \
+                Context(self.context, version=self.strategy.version)
+        self._context.profiler = self.profiler
+        self._context.seek(self._context.calendar.position(self.start_date))
+        self._portfolio.context = self._context
 
         # Buy stocks and put into Portfolio in accordance with strategy
-        to_buy = self.strategy.initialize(self._portfolio)
+        to_buy = self.strategy.initialize(self._portfolio) if self.profiler is None else \
+            self.profiler.call(self.strategy, "initialize", self._portfolio)
         for stock in to_buy:
             name = stock[0]
             percentage = stock[1]
-            price = self._portfolio.context["Adj Close"][name].iloc[-1]
+            price = self._context.latest(name)
             num_shares = (self.buy_power / price) * percentage
             self._portfolio.buy(name, num_shares, self.buy_power * percentage, self.start_date)
 
-        print("Finished Initialization")
-        print(self._portfolio.report())
\ No newline at end of file
+        if self.verbose:
+            print("Finished Initialization")
+            print(self._portfolio.report())
+
+    @property
+    def portfolio(self):
+        return self._portfolio
+
+    @property
+    def data(self):
+        """Full data set as a DataFrame."""
+        return self.context.data if isinstance(self.context, Context) else self.context
+
+    def _start_recording(self, position, end_position):
+        """Preallocates the daily equity curve arrays."""
+        days = max(end_position - position + 1, 0)
+        self._first = position
+        self._value = np.empty(days)
+        self._cash = np.empty(days)
+        self._benchmark_value = np.empty(days)
+        if self._context.has(self.benchmark):
+            self._benchmark_shares = self.buy_power / self._context.price(self.benchmark, self.start_date)
+        else:
+            self._benchmark_shares = np.nan
+
+    @profiled
+    def _record(self, position):
+        i = position - self._first
+        self._value[i] = self._portfolio.current_value()
+        self._cash[i] = self._portfolio.buy_power
+        if not np.isnan(self._benchmark_shares):
+            self._benchmark_value[i] = self._benchmark_shares * self._context.latest(self.benchmark)
+        else:
+            self._benchmark_value[i] = np.nan
+
+    def _finish_recording(self, position):
+        days = position - self._first
+        transactions = sum(1 for t in self._portfolio.history if t.type in (TransactionType.BUY, TransactionType.SELL))
+        self.result = SimulationResult(self.name, self.data.index[self._first:self._first + days], self._value[:days],
+                                       self._cash[:days], self._value[:days] - self._cash[:days],
+                                       self._benchmark_value[:days], transactions)
+
+    def _write_checkpoint_header(self):
+        """Starts a new checkpoint file with everything needed to rebuild the simulation except the price data."""
+        self._checkpointed_history = 0
+        self._checkpointed_days = 0
+        header = {
+            "name": self.name,
+            "buy_power": self.buy_power,
+            "strategy": self.strategy,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "benchmark": self.benchmark,
+            "checkpoint_every": self.checkpoint_every,
+            "actions": self.actions,
+            "version": self.strategy.version,
+        }
+        with open(self.checkpoint, "wb") as checkpoint:
+            pickle.dump(header, checkpoint, pickle.HIGHEST_PROTOCOL)
+
+    @profiled
+    def _write_checkpoint(self, position, current_date):
+        """Appends the state changes since the previous checkpoint. The price context is never written."""
+        days = position - self._first
+        record = {
+            "position": position,
+            "current_date": current_date,
+            "buy_power": self._portfolio.buy_power,
+            "stocks": self._portfolio.stocks,
+            "history": self._portfolio.history[self._checkpointed_history:],
+            "value": self._value[self._checkpointed_days:days],
+            "cash": self._cash[self._checkpointed_days:days],
+            "benchmark": self._benchmark_value[self._checkpointed_days:days],
+        }
+        with open(self.checkpoint, "ab") as checkpoint:
+            pickle.dump(record, checkpoint, pickle.HIGHEST_PROTOCOL)
+        self._checkpointed_history = len(self._portfolio.history)
+        self._checkpointed_days = days
+
+    @staticmethod
+    def resume(path, context, verbose=True):
+        """Continues a simulation from the last complete checkpoint in "path".
+
+        Args:
+            path (str): Checkpoint file written by a simulation with "checkpoint" set.
+            context (DataFrame or Context): The data set the simulation was started with.
+            verbose (bool, optional): Print portfolio reports. Defaults to True.
+
+        Raises:
+            ValueError: "context" is not the data set the checkpoint was written against, or "path" has no
+                complete header.
+
+        Returns:
+            Simulation: The finished simulation. Its portfolio and result match an uninterrupted run.
+        """
+        records = []
+        valid = 0
+        with open(path, "rb") as checkpoint:
+            while True:
+                try:
+                    records.append(pickle.load(checkpoint))
+                except Exception:
+                    # A crash can leave a partly written last record, which may fail to unpickle in any way
+                    break
+                valid = checkpoint.tell()
+        if not records:
+            raise ValueError(f"Checkpoint {path} has no complete header")
+        # Drop a torn tail so the resumed run appends after the last complete record
+        with open(path, "r+b") as checkpoint:
+            checkpoint.truncate(valid)
+        header = records[0]
+        simulation = Simulation(context, header["buy_power"], header["strategy"], header["start_date"], header["end_date"],
+                                header["name"], verbose, header["version"], header["benchmark"], path, header["checkpoint_every"],
+                                actions=header.get("actions"))
+        if data_version(simulation.data) != header["version"]:
+            raise ValueError(f"Checkpoint {path} was written against a different data set")
+        if len(records) == 1:
+            simulation.run()
+            return simulation
+
+        simulation.strategy.prepare(simulation.data, header["version"])
+        simulation._context = context.as_of(0) if isinstance(context, Context) else Context(context)
+        simulation._portfolio.context = simulation._context
+        last = records[-1]
+        simulation._portfolio.buy_power = last["buy_power"]
+        simulation._portfolio.stocks = last["stocks"]
+        simulation._portfolio.history = [t for record in records[1:] for t in record["history"]]
+
+        calendar = simulation._context.calendar
+        first = calendar.position(simulation.start_date)
+        end_position = calendar.position(simulation.end_date)
+        simulation._start_recording(first, end_position)
+        days = last["position"] - first
+        simulation._value[:days] = np.concatenate([r["value"] for r in records[1:]])
+        simulation._cash[:days] = np.concatenate([r["cash"] for r in records[1:]])
+        simulation._benchmark_value[:days] = np.concatenate([r["benchmark"] for r in records[1:]])
+        simulation._checkpointed_history = len(simulation._portfolio.history)
+        simulation._checkpointed_days = days
+        simulation._simulate(last["position"], end_position, last["current_date"])
+        return simulation
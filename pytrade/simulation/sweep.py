@@ -0,0 +1,140 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from ..context import Context
+from ..data import data_version, PricePanel
+from ..portfolio import TransactionType, rate_of_return, cash_flows
+from .simulation import Simulation
+
+# Price data attached by each worker process, see _attach
+_shared = {}
+
+
+def sweep_grid(strategies, start_dates, end_dates, capitals):
+    """Every combination of strategy class, start date, end date and starting capital.
+
+    Returns:
+        list: (strategy class, start date, end date, capital) tuples.
+    """
+    return list(itertools.product(strategies, start_dates, end_dates, capitals))
+
+def share_context(context):
+    """Copies a context into a shared memory block that worker processes can attach to without pickling it.
+
+    Args:
+        context (DataFrame): Full data set.
+
+    Returns:
+        tuple: (SharedMemory, spec passed to _attach). The caller closes and unlinks the block.
+    """
+    values = np.ascontiguousarray(context.to_numpy(dtype=np.float64))
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+    spec = {
+        "name": shm.name,
+        "shape": values.shape,
+        "dtype": values.dtype.str,
+        "index": context.index,
+        "columns": context.columns,
+        "version": data_version(context),
+    }
+    return shm, spec
+
+def share_panel(panel):
+    """Spec that lets worker processes open a memory mapped panel, see _attach.
+
+    Args:
+        panel (PricePanel): Panel opened from a file, see PricePanel.from_frame.
+
+    Raises:
+        ValueError: "panel" is not memory mapped from a file.
+
+    Returns:
+        dict: Spec passed to _attach.
+    """
+    filename = getattr(panel.values, "filename", None)
+    if filename is None:
+        raise ValueError("Only a panel memory mapped from a file can be shared, see PricePanel.from_frame")
+    return {"panel": filename, "version": data_version(panel)}
+
+def _attach(spec):
+    """Worker initializer: maps the shared price block, or the panel file, into a context without copying it."""
+    if "panel" in spec:
+        _shared["context"] = Context(PricePanel.open(spec["panel"]), version=spec["version"])
+        _shared["version"] = spec["version"]
+        return
+    shm = shared_memory.SharedMemory(name=spec["name"])
+    values = np.ndarray(spec["shape"], dtype=np.dtype(spec["dtype"]), buffer=shm.buf)
+    _shared["shm"] = shm
+    _shared["context"] = pd.DataFrame(values, index=spec["index"], columns=spec["columns"], copy=False)
+    _shared["version"] = spec["version"]
+
+def _run(task):
+    strategy_class, start_date, end_date, capital = task
+    name = f"{strategy_class.__name__}_{start_date}_{end_date}_{capital}"
+    simulation = Simulation(_shared["context"], capital, strategy_class(name), start_date, end_date,
+                            name=name, verbose=False, version=_shared["version"])
+    simulation._portfolio.logging = False
+    portfolio = simulation.run()
+    # Valued on the last simulated day, not today
+    amounts, years = cash_flows(portfolio, today=pd.Timestamp(portfolio.context.date).date())
+    return {
+        "strategy": strategy_class.__name__,
+        "start_date": start_date,
+        "end_date": end_date,
+        "capital": capital,
+        "final_value": portfolio.current_value(),
+        "rate_of_return": round(rate_of_return(amounts, years, portfolio.current_value()), 3),
+        "transactions": sum(1 for t in portfolio.history if t.type in (TransactionType.BUY, TransactionType.SELL)),
+    }
+
+def iter_sweep(context, grid, workers=None):
+    """Runs every simulation of "grid" on a process pool, yielding each result as it finishes.
+
+    The context is placed in shared memory once and every worker attaches to it, so the price
+    data is neither pickled per task nor copied per worker. A memory mapped panel is not copied
+    at all: every worker maps the same file and shares its pages.
+
+    Args:
+        context (DataFrame or PricePanel): Full data set. A panel must be memory mapped from a file.
+        grid (list): (strategy class, start date, end date, capital) tuples, see sweep_grid.
+        workers (int, optional): Worker processes. Defaults to the number of CPUs.
+
+    Yields:
+        dict: strategy, start_date, end_date, capital, final_value, rate_of_return and transactions of one run.
+    """
+    if isinstance(context, PricePanel):
+        shm, spec = None, share_panel(context)
+    else:
+        shm, spec = share_context(context)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(spec,)) as pool:
+            futures = [pool.submit(_run, task) for task in grid]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+def sweep(context, grid, workers=None, callback=None):
+    """Runs every simulation of "grid" on a process pool and collects the results in one table.
+
+    Args:
+        context (DataFrame or PricePanel): Full data set, see iter_sweep.
+        grid (list): (strategy class, start date, end date, capital) tuples, see sweep_grid.
+        workers (int, optional): Worker processes. Defaults to the number of CPUs.
+        callback (function, optional): Called with each result row as it arrives. Defaults to None.
+
+    Returns:
+        DataFrame: One row per simulation, in completion order.
+    """
+    rows = []
+    for row in iter_sweep(context, grid, workers):
+        rows.append(row)
+        if callback is not None:
+            callback(row)
+    return pd.DataFrame(rows, columns=["strategy", "start_date", "end_date", "capital", "final_value",
+                                       "rate_of_return", "transactions"])
@@ -0,0 +1,139 @@
+import datetime
+import numpy as np
+import pandas as pd
+from ..portfolio import TransactionType
+from ..trading_calendar import TradingCalendar
+from .simulation import Simulation
+
+
+class VectorizedBacktest:
+    """Backtest driven by a dates x tickers matrix instead of an event loop.
+
+    A strategy either emits target weights (fraction of portfolio value per ticker, the rest held
+    as cash) or trades (shares bought, negative for sold). Holdings, cash, portfolio value and
+    turnover are then computed with array operations over the whole period.
+    """
+    def __init__(self, context, buy_power, start_date, end_date=datetime.date.today(), field="Adj Close"):
+        """VectorizedBacktest initializer.
+
+        Args:
+            context (DataFrame): Full data set.
+            buy_power (number): Starting cash.
+            start_date (date): First day of the backtest.
+            end_date (date, optional): Last day of the backtest. Defaults to date.today().
+            field (str, optional): Price field trades are valued at. Defaults to "Adj Close".
+        """
+        self.context = context
+        self.buy_power = buy_power
+        self.start_date = start_date
+        self.end_date = end_date
+        self.calendar = TradingCalendar(context.index)
+        self.start = self.calendar.position(start_date)
+        self.end = self.calendar.position(end_date)
+        prices = context[field].iloc[self.start:self.end + 1]
+        self.dates = prices.index
+        self.tickers = prices.columns
+        self.prices = prices.to_numpy(dtype=np.float64)
+        self.holdings = None
+
+    def _align(self, matrix):
+        return matrix.reindex(index=self.dates, columns=self.tickers).to_numpy(dtype=np.float64)
+
+    def _result(self, holdings, cash, traded):
+        self.holdings = pd.DataFrame(holdings, index=self.dates, columns=self.tickers)
+        invested = np.where(holdings == 0, 0, holdings * self.prices).sum(axis=1)
+        value = invested + cash
+        return pd.DataFrame({"value": value, "cash": cash, "invested": invested, "turnover": traded / value},
+                            index=self.dates)
+
+    def run_weights(self, weights):
+        """Rebalances to target weights on every date where "weights" has a row, holding in between.
+
+        Args:
+            weights (DataFrame): Dates x tickers target weights. All-NaN rows (or missing dates) mean no rebalance.
+
+        Returns:
+            DataFrame: value, cash, invested and turnover for every date.
+        """
+        w = self._align(weights)
+        rows = np.arange(len(self.dates))
+        rebalance = ~np.isnan(w).all(axis=1)
+        rebalance[0] = True
+        w = np.nan_to_num(w)
+
+        # Weights and prices of the last rebalance on or before each row
+        last = np.maximum.accumulate(np.where(rebalance, rows, 0))
+        # Growth since the last rebalance. At a rebalance row the growth of the previous weights applies.
+        previous = np.concatenate([[0], last[:-1]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drift = np.nan_to_num(self.prices / self.prices[previous], nan=1.0, posinf=1.0)
+        carried = 1 - w[previous].sum(axis=1) + (w[previous] * drift).sum(axis=1)
+        carried[0] = 1
+        value_at_rebalance = self.buy_power * np.cumprod(np.where(rebalance, carried, 1))
+        base = value_at_rebalance[last]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            holdings = np.nan_to_num(w[last] * base[:, None] / self.prices[last])
+        cash = base * (1 - w[last].sum(axis=1))
+        traded = np.abs(np.diff(holdings, axis=0, prepend=0)) * np.nan_to_num(self.prices)
+        return self._result(holdings, cash, traded.sum(axis=1))
+
+    def run_trades(self, trades):
+        """Applies a matrix of share trades, valued at each day's price.
+
+        Args:
+            trades (DataFrame): Dates x tickers shares traded (negative for sells). Missing entries mean no trade.
+
+        Returns:
+            DataFrame: value, cash, invested and turnover for every date.
+        """
+        t = np.nan_to_num(self._align(trades))
+        traded = np.where(t == 0, 0, t * self.prices)
+        holdings = np.cumsum(t, axis=0)
+        cash = self.buy_power - np.cumsum(traded.sum(axis=1))
+        return self._result(holdings, cash, np.abs(traded).sum(axis=1))
+
+    def replay_strategy(self, strategy):
+        """Replays an event-loop Strategy (e.g. Utkarsh_v1_*) through run_trades, see replay_trades.
+
+        This is a validation helper, not a fast mode: it runs the full event-loop Simulation first,
+        so it is always slower than that Simulation. Use it to check the matrix engine against the
+        event loop, and run_weights or run_trades with precomputed signals for speed.
+
+        Returns:
+            DataFrame: value, cash, invested and turnover for every date.
+        """
+        trades = replay_trades(self.context, strategy, self.buy_power, self.start_date, self.end_date)
+        return self.run_trades(trades)
+
+
+def replay_trades(context, strategy, buy_power, start_date, end_date):
+    """Trade matrix of an event-loop run of a (ticker, fraction) Strategy, for validating VectorizedBacktest.
+
+    The strategy's decisions depend on its own holdings, so they are taken by a quiet Simulation
+    and its transaction history is laid out as a dates x tickers matrix of shares. Running the
+    matrix through run_trades must reproduce the Simulation's equity curve.
+
+    Args:
+        context (DataFrame): Full data set.
+        strategy (Strategy): Strategy to run.
+        buy_power (number): Starting cash.
+        start_date (date): First day.
+        end_date (date): Last day.
+
+    Returns:
+        DataFrame: Shares traded per date and ticker.
+    """
+    simulation = Simulation(context, buy_power, strategy, start_date, end_date, verbose=False)
+    simulation._portfolio.logging = False
+    portfolio = simulation.run()
+
+    calendar = TradingCalendar(context.index)
+    start = calendar.position(start_date)
+    dates = context.index[start:calendar.position(end_date) + 1]
+    trades = pd.DataFrame(0.0, index=dates, columns=context["Adj Close"].columns)
+    for trans in portfolio.history:
+        if trans.type in (TransactionType.BUY, TransactionType.SELL):
+            sign = 1 if trans.type == TransactionType.BUY else -1
+            trades.iat[calendar.position(trans.date) - start, trades.columns.get_loc(trans.stock.ticker)] += sign * trans.stock.num_shares
+    return trades
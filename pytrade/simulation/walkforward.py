@@ -0,0 +1,48 @@
+import pandas as pd
+from ..context import Context
+from ..data import data_version
+from ..trading_calendar import TradingCalendar
+from .simulation import Simulation
+
+
+def rolling_windows(context, first_start, last_start, length_days, step_days):
+    """Test windows of "length_days" calendar days, starting every "step_days" from "first_start" to "last_start".
+
+    Returns:
+        list: (start date, end date) tuples.
+    """
+    starts = pd.date_range(first_start, last_start, freq=f"{step_days}D")
+    last = context.index[-1]
+    return [(s.date(), min(s + pd.Timedelta(days=length_days), last).date()) for s in starts]
+
+def walk_forward(context, strategy_class, buy_power, windows, name="walk_forward"):
+    """Runs one simulation per window over a single data set, sharing all price-derived state between them.
+
+    The data set is hashed, wrapped in a Context and analysed (RollingExtrema and AnalysisCube
+    through state_cache) once. Each window then only pays for its own trading days.
+
+    Args:
+        context (DataFrame): Full data set.
+        strategy_class (class): Strategy subclass, instantiated per window.
+        buy_power (number): Starting capital of every window.
+        windows (list): (start, end) test windows, or ((train start, train end), (test start, test end)) pairs.
+            The current strategies have no fitted parameters, so only the test window is simulated.
+        name (str, optional): Prefix of the simulation names. Defaults to "walk_forward".
+
+    Returns:
+        DataFrame: Per-window summary (see SimulationResult.summary) with start_date and end_date columns.
+    """
+    version = data_version(context)
+    shared = Context(context)
+    rows = []
+    for i, window in enumerate(windows):
+        start_date, end_date = window[-1] if isinstance(window[-1], tuple) else window
+        simulation = Simulation(shared, buy_power, strategy_class(f"{name}_{i}"), start_date, end_date,
+                                name=f"{name}_{i}", verbose=False, version=version)
+        simulation._portfolio.logging = False
+        simulation.run()
+        row = simulation.result.summary()
+        row["start_date"] = start_date
+        row["end_date"] = end_date
+        rows.append(row)
+    return pd.DataFrame(rows).set_index("name")
@@ -1,7 +1,60 @@
+from .. import analysis_1
+from ..cache import analysis_cache, state_cache
+from ..cube import AnalysisCube
+from ..data import data_version
+from ..extrema import RollingExtrema
+from ..profiler import profiled
+
 class Strategy:
+    windows = None # (short, long) window names analysed by the strategy
+    profiler = None # Profiler timing the analysis, see pytrade.profiler
+
     def __init__(self, name):
         self.name = name
-        pass
+        self.version = None # data_version of the prepared context
+        self.extrema = None # RollingExtrema over the full simulation context, see prepare
+        self.cube = None # AnalysisCube of the strategy's windows, see prepare
+
+    @profiled
+    def prepare(self, context, version=None):
+        """Precomputes the analysis of every date of the full data set once, before a simulation runs.
+        The precomputation is shared with every other strategy prepared on the same data.
+
+        Args:
+            context (DataFrame): Full data set of the simulation.
+            version (str, optional): data_version of context, if already known. Defaults to None.
+        """
+        self.version = data_version(context) if version is None else version
+        self.extrema = state_cache.get((self.version, "extrema"), lambda: RollingExtrema(context["Adj Close"]))
+        if self.windows is not None:
+            self.cube = state_cache.get((self.version, self.windows), lambda: AnalysisCube(self.extrema, *self.windows))
+
+    def __getstate__(self):
+        # Precomputed state is rebuilt by prepare and a profiler belongs to one run, neither is pickled
+        state = self.__dict__.copy()
+        state["extrema"] = None
+        state["cube"] = None
+        state.pop("profiler", None)
+        return state
+
+    @profiled
+    def stochastic(self, adj_close_df, analysis_date):
+        """Analysis 1.1.1 of the strategy's windows, memoized in analysis_cache across strategy instances.
+
+        Args:
+            adj_close_df (DataFrame): Adjusted close prices up to the analysis date.
+            analysis_date (date): Date of the analysis.
+
+        Returns:
+            DataFrame: Analysis indexed by ticker. A copy, so callers may sort it in place.
+        """
+        if self.extrema is not None and self.extrema.covers(adj_close_df):
+            key = (self.version, len(adj_close_df.index), analysis_date, self.windows)
+        else:
+            key = (data_version(adj_close_df), len(adj_close_df.index), analysis_date, self.windows)
+        analysis = analysis_cache.get(key, lambda: analysis_1.stochastic(adj_close_df, analysis_date, *self.windows,
+                                                                         self.extrema, self.cube))
+        return analysis.copy()
 
     def initialize(self, portfolio):
         pass
@@ -14,4 +67,4 @@ class Strategy:
 
     def analysis(self, portfolio, analysis_date):
         pass
-    
\ No newline at end of file
+    
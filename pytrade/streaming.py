@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+from .analysis_1 import stochastic_metrics, stochastic_metric
+from .extrema import WINDOWS
+from .trading_calendar import to_day
+
+
+class StreamingAnalysis:
+    """Analysis 1.1.1 updated one bar at a time, for live use.
+
+    Only the index-relative ratios of the longest window are kept, in a buffer that is compacted
+    as old rows fall out of it, so the cost of a bar depends on the window lengths and the
+    number of tickers but not on how much history has been streamed. Highs, lows and metrics are
+    computed with the same ratios and the same analysis_1 metric functions as RollingExtrema and
+    AnalysisCube, so a bar's analysis equals the batch analysis of the same date.
+    """
+    def __init__(self, tickers, pairs, windows=WINDOWS, index="^GSPC"):
+        """StreamingAnalysis initializer.
+
+        Args:
+            tickers (list): Tickers of every bar, including "index".
+            pairs (list): (short, long) window name pairs to analyse, e.g. a strategy's "windows".
+            windows (dict, optional): Window name to lookback in calendar days. Defaults to WINDOWS.
+            index (str, optional): Index the ratios are taken against. Defaults to "^GSPC".
+
+        Raises:
+            ValueError: "index" is not one of "tickers".
+        """
+        self.tickers = pd.Index(tickers)
+        if index not in self.tickers:
+            raise ValueError(f"Index {index} missing from the streamed tickers")
+        self.index = index
+        self.pairs = [tuple(pair) for pair in pairs]
+        self.windows = {name: windows[name] for pair in self.pairs for name in pair}
+        self.longest = max(self.windows.values())
+        self.date = None
+        self._index_column = self.tickers.get_loc(index)
+        # A window of d calendar days holds at most d + 1 daily bars
+        capacity = self.longest + 1
+        self._days = np.empty(2 * capacity, dtype="datetime64[D]")
+        self._ratios = np.empty((2 * capacity, len(self.tickers)))
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    def _append(self, day, ratios):
+        if self._end == len(self._days):
+            # Move the live rows to the front; happens once every "capacity" bars
+            count = self._end - self._start
+            self._days[:count] = self._days[self._start:self._end]
+            self._ratios[:count] = self._ratios[self._start:self._end]
+            self._start, self._end = 0, count
+        self._days[self._end] = day
+        self._ratios[self._end] = ratios
+        self._end += 1
+        oldest = day - np.timedelta64(self.longest, "D")
+        self._start += int(np.searchsorted(self._days[self._start:self._end], oldest, side="left"))
+
+    def push(self, date, prices):
+        """Adds a bar without analysing it, e.g. to warm up on history.
+
+        Args:
+            date (date): Bar date. Must be after the previous bar's.
+            prices (Series, dict or array): Adjusted close of every ticker. Series and dicts are matched by ticker.
+
+        Raises:
+            ValueError: "date" is not after the previous bar.
+        """
+        day = to_day(date)
+        if self.date is not None and day <= to_day(self.date):
+            raise ValueError(f"Bar {date} is not after the previous bar {self.date}")
+        if isinstance(prices, dict):
+            prices = pd.Series(prices)
+        if isinstance(prices, pd.Series):
+            prices = prices.reindex(self.tickers)
+        values = np.asarray(prices, dtype=np.float64)
+        self._append(day, values / values[self._index_column])
+        self._scale = values[self._index_column]
+        self.date = date
+
+    def warm_up(self, adj_close):
+        """Pushes the rows of a history frame that can still fall in a window of the next bar.
+
+        Args:
+            adj_close (DataFrame): Dates x tickers adjusted close prices.
+        """
+        calendar_days = pd.DatetimeIndex(adj_close.index).values.astype("datetime64[D]")
+        first = int(np.searchsorted(calendar_days, calendar_days[-1] - np.timedelta64(self.longest, "D"), side="left"))
+        values = adj_close.reindex(columns=self.tickers).to_numpy(dtype=np.float64)
+        for row in range(first, len(adj_close.index)):
+            self.push(adj_close.index[row], values[row])
+
+    def analysis(self):
+        """Analysis of the latest bar for every window pair.
+
+        Returns:
+            dict: (short, long) pair to a DataFrame with the columns of analysis_1.stochastic.
+        """
+        day = self._days[self._end - 1]
+        live = self._days[self._start:self._end]
+        ratios = self._ratios[self._start:self._end]
+        scale = self._scale
+        extrema = {}
+        for name, lookback in self.windows.items():
+            window = ratios[int(np.searchsorted(live, day - np.timedelta64(lookback, "D"), side="left")):]
+            extrema[name] = (np.fmax.reduce(window, axis=0) * scale, np.fmin.reduce(window, axis=0) * scale)
+
+        latest = ratios[-1] * scale
+        frames = {}
+        for short, long in self.pairs:
+            short_high, short_low = extrema[short]
+            long_high, long_low = extrema[long]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                short_range, long_range, stochastic_difference, potential = stochastic_metrics(latest,
+                    short_high, short_low, long_high, long_low)
+                metric = stochastic_metric(stochastic_difference, potential)
+            frames[(short, long)] = pd.DataFrame({
+                "latest": latest, f"{short}_high": short_high, f"{short}_low": short_low,
+                f"{long}_high": long_high, f"{long}_low": long_low, f"{short}_range": short_range,
+                f"{long}_range": long_range, "stochastic_difference": stochastic_difference,
+                "potential": potential, "metric": metric}, index=self.tickers)
+        return frames
+
+    def update(self, date, prices):
+        """Adds a bar and analyses it, see push and analysis."""
+        self.push(date, prices)
+        return self.analysis()
+
+
+class Signal:
+    def __init__(self, date, pair, buy, sell, analysis):
+        self.date = date
+        self.pair = pair # (short, long) windows the signal was derived from
+        self.buy = buy # Tickers to buy, best first
+        self.sell = sell # Held tickers to sell
+        self.analysis = analysis
+
+    def __str__(self):
+        return f"{self.date} {self.pair[0]}-{self.pair[1]} BUY {self.buy} SELL {self.sell}"
+
+
+class StreamingEngine:
+    """Consumes bars from a replay or a live feed and emits buy/sell signals for each window pair.
+
+    The signal rules are those of the Utkarsh_v1 base strategies: buy the tickers with the
+    highest metric and sell held tickers whose metric is negative.
+    """
+    def __init__(self, tickers, pairs, top=2, holdings=None, windows=WINDOWS, index="^GSPC"):
+        """StreamingEngine initializer.
+
+        Args:
+            tickers (list): Tickers of every bar, including "index".
+            pairs (list): (short, long) window name pairs to emit signals for.
+            top (int, optional): Number of tickers to buy per signal. Defaults to 2.
+            holdings (dict, optional): Window pair to the set of held tickers. Defaults to nothing held.
+            windows (dict, optional): Window name to lookback in calendar days. Defaults to WINDOWS.
+            index (str, optional): Index the ratios are taken against. Defaults to "^GSPC".
+        """
+        self.state = StreamingAnalysis(tickers, pairs, windows, index)
+        self.top = top
+        self.holdings = {tuple(pair): set() for pair in pairs} if holdings is None else holdings
+
+    def on_bar(self, date, prices):
+        """Updates the analysis with one bar.
+
+        Returns:
+            list: One Signal per window pair.
+        """
+        signals = []
+        for pair, analysis in self.state.update(date, prices).items():
+            ranked = analysis["metric"].sort_values(ascending=False)
+            held = self.holdings.get(pair, set())
+            sell = [ticker for ticker in held if round(analysis["metric"][ticker], 3) < 0]
+            signals.append(Signal(date, pair, list(ranked.index[:self.top]), sell, analysis))
+        return signals
+
+    def run(self, bars):
+        """Yields the signals of every bar of an iterable of (date, prices), e.g. replay."""
+        for date, prices in bars:
+            yield self.on_bar(date, prices)
+
+    async def run_async(self, feed):
+        """Yields the signals of every bar of an async iterable of (date, prices), e.g. a live feed."""
+        async for date, prices in feed:
+            yield self.on_bar(date, prices)
+
+
+def replay(source, field="Adj Close"):
+    """Bars of a local price file or frame, in date order.
+
+    Args:
+        source (str or DataFrame): Pickled or CSV price frame, or the frame itself. (field, ticker)
+            MultiIndex columns are reduced to "field".
+        field (str, optional): Price field to replay. Defaults to "Adj Close".
+
+    Yields:
+        tuple: (date, Series of prices by ticker).
+    """
+    if isinstance(source, str):
+        source = pd.read_csv(source, index_col=0, parse_dates=True) if source.endswith(".csv") else pd.read_pickle(source)
+    if isinstance(source.columns, pd.MultiIndex):
+        source = source[field]
+    for date, prices in source.sort_index().iterrows():
+        yield date, prices
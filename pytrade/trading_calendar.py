@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+
+def to_day(date):
+    """Day precision numpy datetime of a date, datetime or Timestamp."""
+    return np.datetime64(pd.Timestamp(date).date(), "D")
+
+
+class TradingCalendar:
+    """Maps dates to integer row positions of a price index.
+
+    Dates are converted to day precision once, and every lookup is a binary search, so the
+    analysis and simulation code can work on row positions and slices instead of building
+    per-call date masks.
+    """
+    def __init__(self, index):
+        """Calendar initializer.
+
+        Args:
+            index (DatetimeIndex): Sorted row dates of the price data.
+        """
+        self.index = index
+        self.days = pd.DatetimeIndex(index).values.astype("datetime64[D]")
+
+    def __len__(self):
+        return len(self.days)
+
+    def date(self, position):
+        return self.index[position]
+
+    def position(self, date):
+        """Row of the last trading day on or before "date".
+
+        Args:
+            date (date): Lookup date.
+
+        Returns:
+            int: Row position, -1 if "date" is before the first row.
+        """
+        return int(np.searchsorted(self.days, to_day(date), side="right")) - 1
+
+    def is_trading_day(self, date):
+        position = self.position(date)
+        return position >= 0 and self.days[position] == to_day(date)
+
+    def window_start(self, date, lookback_days):
+        """First row dated no earlier than "lookback_days" calendar days before "date".
+
+        Args:
+            date (date): Date the window is measured back from.
+            lookback_days (int): Window length in calendar days.
+
+        Returns:
+            int: Start row of the window.
+        """
+        return int(np.searchsorted(self.days, to_day(date) - np.timedelta64(lookback_days, "D"), side="left"))
+
+    def window_starts(self, lookback_days):
+        """Start row of the window ending on each row.
+
+        Args:
+            lookback_days (int): Window length in calendar days.
+
+        Returns:
+            ndarray: Start row for every row.
+        """
+        return np.searchsorted(self.days, self.days - np.timedelta64(lookback_days, "D"), side="left")
+
+    def window(self, date, lookback_days):
+        """Rows of the window ending on "date", as a slice.
+
+        Args:
+            date (date): Date the window is measured back from.
+            lookback_days (int): Window length in calendar days.
+
+        Returns:
+            slice: Rows from the window start through the last row on or before "date".
+        """
+        return slice(self.window_start(date, lookback_days), self.position(date) + 1)
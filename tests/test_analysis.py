@@ -0,0 +1,62 @@
+import datetime
+import numpy as np
+from pytrade import analysis_1
+from pytrade.data import calculate_ratio, synthetic_panel
+from pytrade.cube import AnalysisCube
+from pytrade.extrema import RollingExtrema, WINDOWS
+
+DATA = synthetic_panel(tickers=8, years=3)["Adj Close"].copy()
+# A ticker listed late and a gap, which the window highs/lows skip
+DATA.iloc[:300, 2] = np.nan
+DATA.iloc[400:410, 5] = np.nan
+ROWS = [0, 1, 20, 64, 299, 300, 405, 500, len(DATA) - 1]
+
+
+def direct(row, analysis_date, windows):
+    return analysis_1.window_frame(calculate_ratio(DATA.iloc[:row + 1]), analysis_date, windows)
+
+
+def test_rolling_extrema_match_direct_windows():
+    extrema = RollingExtrema(DATA)
+    windows = list(WINDOWS)
+    for row in ROWS:
+        date = DATA.index[row]
+        expected = direct(row, date, windows)
+        assert extrema.covers(DATA.iloc[:row + 1])
+        actual = extrema.frame(date, windows, row=row)
+        assert actual.columns.equals(expected.columns)
+        assert np.array_equal(actual.to_numpy(), expected.to_numpy(), equal_nan=True)
+
+
+def test_rolling_extrema_on_a_non_trading_day():
+    extrema = RollingExtrema(DATA)
+    row = 500
+    # The Saturday after the row's date moves the window starts
+    date = DATA.index[row].date() + datetime.timedelta(days=5 - DATA.index[row].weekday())
+    expected = direct(row, date, list(WINDOWS))
+    actual = extrema.frame(date, list(WINDOWS), row=row)
+    assert np.array_equal(actual.to_numpy(), expected.to_numpy(), equal_nan=True)
+
+
+def test_analysis_cube_matches_direct_stochastic():
+    extrema = RollingExtrema(DATA)
+    for short, long in [("three_wk", "one_yr"), ("three_m", "one_yr")]:
+        cube = AnalysisCube(extrema, short, long)
+        for row in ROWS:
+            date = DATA.index[row]
+            expected = analysis_1.stochastic(DATA.iloc[:row + 1], date, short, long)
+            actual = cube.frame(date, row=row)
+            assert list(actual.columns) == list(expected.columns)
+            assert np.allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-12, atol=0, equal_nan=True)
+
+
+def test_stochastic_falls_back_when_the_cube_does_not_apply():
+    extrema = RollingExtrema(DATA)
+    cube = AnalysisCube(extrema, "three_wk", "one_yr")
+    row = 500
+    date = DATA.index[row].date() + datetime.timedelta(days=5 - DATA.index[row].weekday())
+    assert cube.frame(date, row=row) is None
+
+    expected = analysis_1.stochastic(DATA.iloc[:row + 1], date, "three_wk", "one_yr")
+    actual = analysis_1.stochastic(DATA.iloc[:row + 1], date, "three_wk", "one_yr", extrema, cube)
+    assert np.allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-12, atol=0, equal_nan=True)
@@ -0,0 +1,54 @@
+import datetime
+import numpy as np
+from pytrade.cache import AnalysisCache, analysis_cache, state_cache
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.simulation import Simulation
+from pytrade.strategy.current_strategies import Utkarsh_v1_short_base
+
+DATA = synthetic_panel(tickers=10, years=2)
+START = datetime.date(2000, 6, 1)
+END = datetime.date(2001, 3, 1)
+
+
+def run(name):
+    simulation = Simulation(DATA, 10000, Utkarsh_v1_short_base(name), START, END, verbose=False)
+    simulation._portfolio.logging = False
+    simulation.run()
+    return simulation.result
+
+
+def test_cache_hits_match_recomputation(monkeypatch):
+    analysis_cache.clear()
+    state_cache.clear()
+    cold = run("a")
+    misses = analysis_cache.info()["misses"]
+    assert misses > 0
+
+    # A second strategy instance on the same data is served from the cache
+    warm = run("b")
+    assert analysis_cache.info()["misses"] == misses
+    assert analysis_cache.info()["hits"] >= misses
+
+    # Bypassing both caches recomputes everything
+    for cache in (analysis_cache, state_cache):
+        monkeypatch.setattr(cache, "get", lambda key, compute: compute())
+    uncached = run("c")
+    assert np.array_equal(cold.value, warm.value)
+    assert np.array_equal(cold.value, uncached.value)
+    assert cold.transactions == warm.transactions == uncached.transactions
+
+
+def test_lru_eviction_by_size_and_bytes():
+    cache = AnalysisCache(maxsize=3, maxbytes=3000)
+    for key in "abc":
+        cache.get(("v1", key), lambda: np.zeros(100))
+    cache.get(("v1", "a"), lambda: None)
+    cache.get(("v2", "d"), lambda: np.zeros(100))
+    assert cache.get(("v1", "b"), lambda: "recomputed") == "recomputed"
+    assert cache.info()["hits"] == 1
+
+    # Over 3000 bytes the least recently used arrays go, the empty "b" entry stays
+    cache.get(("v2", "e"), lambda: np.zeros(300))
+    assert len(cache) == 2 and cache.nbytes == 2400
+    cache.discard("v2")
+    assert len(cache) == 1 and cache.nbytes == 0
@@ -0,0 +1,32 @@
+import datetime
+import numpy as np
+import pandas as pd
+from pytrade.trading_calendar import TradingCalendar
+
+INDEX = pd.bdate_range("2000-01-03", "2001-12-31").delete([10, 11, 12, 200])
+CALENDAR = TradingCalendar(INDEX)
+DATES = [INDEX[0] - pd.Timedelta(days=3), INDEX[0], INDEX[10].date(), datetime.datetime(2000, 6, 3, 15, 30),
+         INDEX[199], INDEX[-1], INDEX[-1] + pd.Timedelta(days=5)] + list(pd.date_range("2000-01-01", "2002-01-10", freq="6D"))
+
+
+def test_positions_match_date_masks():
+    for date in DATES:
+        day = pd.Timestamp(date).normalize()
+        assert CALENDAR.position(date) == (INDEX <= day).sum() - 1
+        assert CALENDAR.is_trading_day(date) == (day in INDEX)
+
+
+def test_windows_match_date_masks():
+    for date in DATES:
+        day = pd.Timestamp(date).normalize()
+        for lookback in (21, 91, 365):
+            expected = np.flatnonzero((INDEX >= day - pd.Timedelta(days=lookback)) & (INDEX <= day))
+            rows = CALENDAR.window(date, lookback)
+            assert list(range(len(INDEX))[rows]) == list(expected)
+            assert CALENDAR.window_start(date, lookback) == (INDEX < day - pd.Timedelta(days=lookback)).sum()
+
+
+def test_window_starts_match_window_start():
+    for lookback in (21, 91, 365):
+        starts = CALENDAR.window_starts(lookback)
+        assert list(starts) == [CALENDAR.window_start(date, lookback) for date in INDEX]
@@ -0,0 +1,77 @@
+import datetime
+import os
+import numpy as np
+import pytest
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.simulation import Simulation
+from pytrade.strategy.current_strategies import Utkarsh_v1_short_base
+
+DATA = synthetic_panel(tickers=10, years=2)
+START = datetime.date(2000, 6, 1)
+END = datetime.date(2001, 3, 1)
+
+
+class Crash(Exception):
+    pass
+
+
+class Crashing(Utkarsh_v1_short_base):
+    """Raises Crash on the "crash_at"th call of to_sell."""
+    crash_at = None
+    calls = 0
+
+    def to_sell(self, portfolio):
+        Crashing.calls += 1
+        if Crashing.calls == Crashing.crash_at:
+            raise Crash()
+        return Utkarsh_v1_short_base.to_sell(self, portfolio)
+
+
+def run(path=None, strategy=None):
+    simulation = Simulation(DATA, 10000, strategy or Utkarsh_v1_short_base("x"), START, END, name="x",
+                            verbose=False, checkpoint=path, checkpoint_every=20)
+    simulation._portfolio.logging = False
+    simulation.run()
+    return simulation
+
+
+def crash(at, resume_path=None, path=None):
+    Crashing.calls = 0
+    Crashing.crash_at = at
+    try:
+        with pytest.raises(Crash):
+            if resume_path is None:
+                run(path, Crashing("x"))
+            else:
+                Simulation.resume(resume_path, DATA, verbose=False)
+    finally:
+        Crashing.crash_at = None
+
+
+def assert_same(resumed, reference):
+    assert np.array_equal(resumed.result.value, reference.result.value)
+    assert np.array_equal(resumed.result.cash, reference.result.cash)
+    assert np.array_equal(resumed.result.benchmark, reference.result.benchmark)
+    assert resumed.portfolio.buy_power == reference.portfolio.buy_power
+    assert [str(t) for t in resumed.portfolio.history] == [str(t) for t in reference.portfolio.history]
+
+
+def test_resume_matches_uninterrupted_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reference = run()
+    crash(75, path="run.ckpt")
+    assert_same(Simulation.resume("run.ckpt", DATA, verbose=False), reference)
+
+
+def test_resume_after_torn_record_and_second_crash(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reference = run()
+    crash(75, path="run.ckpt")
+    with open("run.ckpt", "r+b") as checkpoint:
+        checkpoint.truncate(os.path.getsize("run.ckpt") - 40)
+
+    # The resumed run crashes again after writing more checkpoints behind the torn record
+    crash(90, resume_path="run.ckpt")
+    with open("run.ckpt", "ab") as checkpoint:
+        checkpoint.write(b"\x80\x05garbage")
+    assert_same(Simulation.resume("run.ckpt", DATA, verbose=False), reference)
@@ -0,0 +1,42 @@
+import datetime
+import numpy as np
+import pytest
+from pytrade.context import Context
+from pytrade.data.synthetic import synthetic_panel
+
+DATA = synthetic_panel(tickers=5, years=2)
+
+
+def test_as_of_matches_slicing_the_frame():
+    context = Context(DATA)
+    for position in (0, 1, 100, len(DATA) - 1):
+        view = context.as_of(position)
+        expected = DATA.iloc[:position + 1]
+        assert view.date == DATA.index[position]
+        assert view.index.equals(expected.index)
+        assert view["Adj Close"].equals(expected["Adj Close"])
+        assert view["Close"].equals(expected["Close"])
+        assert view.latest("T0003") == expected["Adj Close"]["T0003"].iloc[-1]
+        assert np.array_equal(view.latest_row("Close"), expected["Close"].iloc[-1].to_numpy())
+        window = expected["Adj Close"][expected.index >= expected.index[-1] - datetime.timedelta(days=91)]
+        assert view.window("Adj Close", 91).equals(window)
+
+
+def test_lookups_do_not_see_past_the_current_date():
+    friday = next(position for position in range(100, 110) if DATA.index[position].weekday() == 4)
+    view = Context(DATA).as_of(friday)
+    assert view.price("T0001", DATA.index[50]) == DATA["Adj Close"]["T0001"].iloc[50]
+    # The weekend after the current date resolves to it
+    assert view.price("T0001", DATA.index[friday] + datetime.timedelta(days=1)) == \
+        DATA["Adj Close"]["T0001"].iloc[friday]
+    assert view.before("T0001", DATA.index[friday], "Close") == DATA["Close"]["T0001"].iloc[friday - 1]
+    with pytest.raises(ValueError):
+        view.price("T0001", DATA.index[friday + 1])
+
+
+def test_views_share_the_data():
+    context = Context(DATA)
+    view = context.as_of(10)
+    view.advance(5)
+    assert (context.position, view.position) == (len(DATA) - 1, 15)
+    assert np.shares_memory(view["Close"].to_numpy(), context["Close"].to_numpy())
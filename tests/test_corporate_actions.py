@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pytrade import CorporateActions
+from pytrade.simulation import Simulation
+from pytrade.strategy.current_strategies import Utkarsh_v1_short_base
+
+DATES = pd.bdate_range("2020-01-06", periods=4)
+PRICES = pd.DataFrame({("Close", "A"): [10.0, 10.0, 10.0, 10.0], ("Close", "B"): [20.0, 20.0, 20.0, 20.0]},
+                      index=DATES)
+
+
+def events(*rows):
+    return pd.DataFrame(rows, columns=["date", "ticker", "action", "value"])
+
+
+def held_simulation(actions):
+    simulation = Simulation(PRICES, 200, Utkarsh_v1_short_base("x"), DATES[0], DATES[-1], verbose=False,
+                            actions=actions)
+    portfolio = simulation._portfolio
+    portfolio.logging = False
+    portfolio.deposit(200, DATES[0])
+    portfolio.buy("A", 10, 100, DATES[0])
+    portfolio.buy("B", 5, 100, DATES[0])
+    return simulation
+
+
+def test_mixed_day_of_splits_and_dividends():
+    actions = CorporateActions(events((DATES[2], "A", "dividend", 0.5), (DATES[2], "A", "split", 2.0),
+                                      (DATES[2], "B", "dividend", 1.0), (DATES[3], "B", "split", 4.0)), PRICES)
+    simulation = held_simulation(actions)
+    simulation._apply_actions(2, DATES[2])
+    portfolio = simulation._portfolio
+
+    # A: 5 in dividends, cost 10 * (1 - 0.5 / 10), then twice the shares; B: 5 in dividends, cost 20 * (1 - 1 / 20)
+    a, b = portfolio.stocks.get("A"), portfolio.stocks.get("B")
+    assert (a.num_shares, b.num_shares) == (20, 5)
+    assert np.isclose(a.avg_cost, 4.75)
+    assert np.isclose(b.avg_cost, 19)
+    assert np.isclose(portfolio.buy_power, 10)
+    assert [t.type.name for t in portfolio.history][-3:] == ["DIVIDEND", "SPLIT", "DIVIDEND"]
+
+
+def test_dividends_without_a_prior_close_are_dropped():
+    with pytest.warns(UserWarning, match="Dropped 2 dividends"):
+        actions = CorporateActions(events((DATES[0], "A", "dividend", 0.5), (DATES[1], "C", "dividend", 1.0),
+                                          (DATES[1], "A", "split", 2.0), (DATES[1], "B", "dividend", 1.0)), PRICES)
+    assert len(actions) == 2
+    assert not np.isnan(actions.factors).any()
+    assert list(actions.frame()["ticker"]) == ["A", "B"]
+
+    simulation = held_simulation(actions)
+    simulation._apply_actions(0, DATES[0])
+    simulation._apply_actions(1, DATES[1])
+    a = simulation._portfolio.stocks.get("A")
+    assert (a.num_shares, a.avg_cost) == (20, 5)
+    assert np.isclose(simulation._portfolio.stocks.get("B").avg_cost, 19)
@@ -0,0 +1,68 @@
+import time
+import numpy as np
+import pytest
+from pytrade.data import PriceStore, LocalFetcher, download, refresh, synthetic_panel
+
+PANEL = synthetic_panel(tickers=8, years=1)
+TICKERS = list(PANEL["Adj Close"].columns)
+
+
+class FlakyFetcher(LocalFetcher):
+    """LocalFetcher whose chunks fail a number of times, or always when they hold a broken ticker."""
+    def __init__(self, frame, failures=0, broken=()):
+        LocalFetcher.__init__(self, frame)
+        self.failures = failures
+        self.broken = set(broken)
+        self.attempts = {}
+
+    def fetch(self, tickers, start=None, end=None, period=None):
+        key = tuple(tickers)
+        self.attempts[key] = self.attempts.get(key, 0) + 1
+        if self.broken.intersection(tickers) or self.attempts[key] <= self.failures:
+            raise ConnectionError(f"Failed to fetch {key}")
+        return LocalFetcher.fetch(self, tickers, start, end, period)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(time, "sleep", delays.append)
+    return delays
+
+
+def test_retries_with_exponential_backoff(tmp_path, sleeps):
+    store = PriceStore(str(tmp_path / "store"))
+    fetcher = FlakyFetcher(PANEL, failures=2)
+    rows, failed = download(TICKERS, fetcher, store, period="max", chunk_size=len(TICKERS), retries=3, backoff=0.5)
+
+    assert failed == []
+    assert rows == len(PANEL)
+    assert sleeps == [0.5, 1.0]
+    assert np.array_equal(store.load().to_numpy(), PANEL[store.load().columns].to_numpy())
+
+
+def test_gives_up_after_retries(tmp_path, sleeps):
+    store = PriceStore(str(tmp_path / "store"))
+    fetcher = FlakyFetcher(PANEL, failures=5)
+    rows, failed = download(TICKERS, fetcher, store, period="max", chunk_size=len(TICKERS), retries=2, backoff=1.0)
+
+    assert rows == 0
+    assert failed == TICKERS
+    assert sleeps == [1.0, 2.0]
+    assert store.empty()
+
+
+def test_partial_failure_keeps_successful_chunks(tmp_path, sleeps):
+    store = PriceStore(str(tmp_path / "store"))
+    fetcher = FlakyFetcher(PANEL, broken=["T0003"])
+    with pytest.raises(RuntimeError, match="Failed to fetch 3 tickers: T0003 T0004 T0005"):
+        refresh(store, fetcher, TICKERS, period="max", chunk_size=3, workers=2, retries=1, backoff=0)
+
+    kept = [t for t in TICKERS if t not in ("T0003", "T0004", "T0005")]
+    assert sorted(store.tickers) == sorted(kept)
+    loaded = store.load()
+    assert np.array_equal(loaded.to_numpy(), PANEL[loaded.columns].to_numpy())
+
+    # The failed chunk is backfilled by the next refresh
+    refresh(store, LocalFetcher(PANEL), TICKERS, period="max", chunk_size=3)
+    assert sorted(store.tickers) == sorted(TICKERS)
@@ -0,0 +1,50 @@
+import datetime
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.portfolio import Portfolio
+
+DAY = datetime.date(2000, 3, 1)
+
+
+def parent():
+    portfolio = Portfolio("parent", synthetic_panel(tickers=3))
+    portfolio.logging = False
+    portfolio.deposit(10000, DAY)
+    portfolio.buy("T0000", 10, 1000, DAY)
+    portfolio.buy("T0001", 5, 500, DAY)
+    return portfolio
+
+
+def state(portfolio):
+    return (portfolio.current_value(), portfolio.buy_power, len(portfolio.history),
+            [(stock.ticker, stock.num_shares, stock.avg_cost) for stock in portfolio.stocks])
+
+
+def test_fork_context_change_leaves_parent_unchanged():
+    portfolio = parent()
+    before = state(portfolio)
+    fork = portfolio.fork()
+
+    data = portfolio.context.data
+    fork.context = data[data.columns[::-1]] * 2
+    assert fork.current_value() != before[0]
+    assert state(portfolio) == before
+
+
+def test_fork_trades_and_undo_redo_leave_parent_unchanged():
+    portfolio = parent()
+    before = state(portfolio)
+    fork = portfolio.fork()
+
+    fork.buy("T0002", 3, 300, DAY)
+    fork.sell("T0000", 10, 1100, DAY)
+    fork.undo()
+    fork.undo()
+    fork.undo()
+    fork.redo()
+    assert state(portfolio) == before
+    assert fork.get_numshares("T0001") == 5
+    assert fork.stocks.get("T0000") is not None and fork.stocks.get("T0002") is None
+
+    portfolio.undo()
+    assert fork.get_numshares("T0001") == 5
+    assert portfolio.stocks.get("T0001") is None
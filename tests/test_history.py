@@ -0,0 +1,33 @@
+import random
+from pytrade.portfolio import History
+
+
+def test_history_matches_a_list_across_forks():
+    rng = random.Random(0)
+    for _ in range(200):
+        history = History()
+        expected = []
+        for k in range(rng.randint(0, 40)):
+            op = rng.random()
+            if op < 0.6:
+                history.append(k)
+                expected.append(k)
+            elif op < 0.75 and expected:
+                assert history.pop() == expected.pop()
+            else:
+                history.fork()
+        assert list(history) == expected
+        for start in range(-2, len(expected) + 2):
+            for stop in (None, start + 2, -1):
+                assert history[start:stop] == expected[start:stop]
+        assert history[::2] == expected[::2]
+
+
+def test_fork_does_not_see_later_changes():
+    parent = History([1, 2, 3])
+    fork = parent.fork()
+    parent.append(4)
+    fork.pop()
+    fork.append(5)
+    assert list(parent) == [1, 2, 3, 4]
+    assert list(fork) == [1, 2, 5]
@@ -0,0 +1,62 @@
+import pickle
+import random
+import numpy as np
+from pytrade.context import Context
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.portfolio import Holdings, Stock
+
+DATA = synthetic_panel(tickers=30, years=1)
+TICKERS = list(DATA["Adj Close"].columns)
+
+
+def test_holdings_match_a_list_of_stocks():
+    rng = random.Random(0)
+    context = Context(DATA)
+    holdings = Holdings(capacity=2)
+    holdings.bind(context)
+    expected = [] # Plain Stocks in the order they were added, the store Holdings replaced
+    for step in range(2000):
+        context.seek(step % len(DATA))
+        op = rng.random()
+        held = {stock.ticker: stock for stock in expected}
+        if op < 0.4:
+            ticker = rng.choice(TICKERS)
+            if ticker not in held:
+                shares, cost = rng.uniform(1, 10), rng.uniform(1, 100)
+                holdings.add(ticker, shares, cost)
+                stock = Stock(ticker, shares, 1)
+                stock.avg_cost = cost
+                expected.append(stock)
+        elif op < 0.7 and expected:
+            stock = rng.choice(expected)
+            view = holdings.get(stock.ticker)
+            view.num_shares = stock.num_shares = stock.num_shares * 2
+            view.avg_cost = stock.avg_cost = stock.avg_cost / 2
+        elif expected:
+            stock = rng.choice(expected)
+            view = holdings.get(stock.ticker)
+            holdings.remove(view)
+            expected.remove(stock)
+            # A removed view keeps its last values
+            assert (view.num_shares, view.avg_cost) == (stock.num_shares, stock.avg_cost)
+
+        assert [(s.ticker, s.num_shares, s.avg_cost) for s in holdings] == \
+            [(s.ticker, s.num_shares, s.avg_cost) for s in expected]
+        direct = [s.num_shares * context.latest(s.ticker) for s in expected]
+        assert np.isclose(holdings.value(context), sum(direct))
+        assert sorted(holdings.values(context)) == sorted(direct)
+
+    restored = pickle.loads(pickle.dumps(holdings))
+    assert [(s.ticker, s.num_shares, s.avg_cost) for s in restored] == \
+        [(s.ticker, s.num_shares, s.avg_cost) for s in holdings]
+
+
+def test_copy_is_independent():
+    holdings = Holdings()
+    holdings.add("T0001", 5, 10)
+    holdings.add("T0002", 3, 20)
+    copy = holdings.copy()
+    copy.get("T0001").num_shares = 50
+    copy.remove(copy.get("T0002"))
+    assert [(s.ticker, s.num_shares) for s in holdings] == [("T0001", 5), ("T0002", 3)]
+    assert [(s.ticker, s.num_shares) for s in copy] == [("T0001", 50)]
@@ -0,0 +1,77 @@
+import datetime
+import os
+import subprocess
+import sys
+import textwrap
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.portfolio import Portfolio, Journal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DAY = datetime.date(2000, 3, 1)
+
+
+def autosaved(name):
+    portfolio = Portfolio(name, synthetic_panel(tickers=3))
+    portfolio.autosave = True
+    portfolio.logging = False
+    return portfolio
+
+
+def test_autosaved_operations_are_on_disk_after_flush(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    portfolio = autosaved("j")
+    portfolio.deposit(1000, DAY)
+    portfolio.buy("T0000", 2, 100, DAY)
+    portfolio.sell("T0000", 1, 60, DAY)
+
+    # Records are buffered until the batch is full or the portfolio is flushed
+    assert Journal.read("j.journal") == []
+    portfolio.flush()
+    assert len(Journal.read("j.journal")) == 3
+    loaded = Portfolio.load("j")
+    assert loaded.buy_power == 960
+    assert len(loaded.history) == 3
+    assert loaded.get_numshares("T0000") == 1
+
+
+def test_buffered_records_are_written_at_exit(tmp_path):
+    script = textwrap.dedent(f"""
+        import datetime
+        from pytrade.data.synthetic import synthetic_panel
+        from pytrade.portfolio import Portfolio
+        portfolio = Portfolio("j", synthetic_panel(tickers=3))
+        portfolio.autosave = True
+        portfolio.logging = False
+        for _ in range(3):
+            portfolio.deposit(10, datetime.date(2000, 3, 1))
+    """)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, check=True)
+
+    assert [record["value"] for record in Journal.read(str(tmp_path / "j.journal"))] == [10, 10, 10]
+
+
+def test_full_batches_are_written(tmp_path):
+    path = str(tmp_path / "b.journal")
+    journal = Journal(path, flush_every=2)
+    for _ in range(3):
+        journal.append({"type": "DEPOSIT"})
+    assert [record["seq"] for record in Journal.read(path)] == [1, 2]
+    journal.close()
+    assert [record["seq"] for record in Journal.read(path)] == [1, 2, 3]
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    path = str(tmp_path / "t.journal")
+    journal = Journal(path)
+    journal.append({"type": "DEPOSIT"})
+    journal.append({"type": "DEPOSIT"})
+    journal.close()
+    with open(path, "ab") as output:
+        output.write(b"0000 {\"type\"")
+
+    assert [record["seq"] for record in Journal.read(path)] == [1, 2]
+    journal = Journal(path)
+    assert journal.append({"type": "DEPOSIT"}) == 3
+    journal.close()
+    assert [record["seq"] for record in Journal.read(path)] == [1, 2, 3]
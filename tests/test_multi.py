@@ -0,0 +1,34 @@
+import datetime
+import os
+import numpy as np
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.simulation import MultiSimulation, Simulation
+from pytrade.strategy.current_strategies import (Utkarsh_v1_short_base, Utkarsh_v1_medium_lowerbound,
+                                                 Utkarsh_v1_long_equal)
+
+DATA = synthetic_panel(tickers=10, years=2)
+START = datetime.date(2000, 6, 1)
+END = datetime.date(2001, 3, 1)
+STRATEGIES = [Utkarsh_v1_short_base, Utkarsh_v1_medium_lowerbound, Utkarsh_v1_long_equal]
+
+
+def test_multi_simulation_matches_separate_runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    multi = MultiSimulation(DATA, [10000, 5000, 2000], [cls(cls.__name__) for cls in STRATEGIES], START, END,
+                            name="m_", verbose=False)
+    multi.run()
+
+    for cls, capital in zip(STRATEGIES, [10000, 5000, 2000]):
+        simulation = Simulation(DATA, capital, cls(cls.__name__), START, END, verbose=False)
+        simulation._portfolio.logging = False
+        portfolio = simulation.run()
+        combined = multi.results[cls.__name__]
+        assert np.array_equal(combined.value, simulation.result.value)
+        assert np.array_equal(combined.cash, simulation.result.cash)
+        assert combined.transactions == simulation.result.transactions
+        assert [str(t) for t in multi.portfolios[cls.__name__].history] == [str(t) for t in portfolio.history]
+
+    total = multi.combined()
+    assert np.allclose(total.value, sum(result.value for result in multi.results.values()))
+    # Sub-portfolios do not log
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".log")]
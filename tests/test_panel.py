@@ -0,0 +1,60 @@
+import datetime
+import numpy as np
+import pandas as pd
+from pytrade.context import Context
+from pytrade.data import PricePanel, data_version, synthetic_panel
+from pytrade.simulation import Simulation, sweep, sweep_grid
+from pytrade.strategy.current_strategies import Utkarsh_v1_short_base
+
+DATA = synthetic_panel(tickers=10, years=2)
+START = datetime.date(2000, 6, 1)
+END = datetime.date(2001, 3, 1)
+
+
+def test_slices_are_views_of_the_memmap(tmp_path):
+    panel = PricePanel.from_frame(DATA, path=str(tmp_path / "p.npy"))
+    assert isinstance(panel.values, np.memmap)
+
+    frame = panel.frame("Close", start=DATA.index[10], end=DATA.index[99])
+    assert len(frame) == 90
+    assert np.shares_memory(frame.to_numpy(), panel.values)
+    assert np.shares_memory(panel.slice(DATA.index[10], tickers=["T0002", "T0003"]), panel.values)
+    assert np.shares_memory(panel.slice(tickers="T0004", field="Adj Close"), panel.values)
+    assert frame.equals(DATA["Close"].iloc[10:100])
+
+
+def test_float32_round_trip(tmp_path):
+    path = str(tmp_path / "p.npy")
+    PricePanel.from_frame(DATA, path=path, dtype=np.float32)
+    panel = PricePanel.open(path)
+
+    frame = panel.to_frame()
+    assert panel.values.dtype == np.float32
+    assert frame.index.equals(DATA.index)
+    assert frame.columns.equals(DATA.columns)
+    assert np.array_equal(frame.to_numpy(), DATA.to_numpy(dtype=np.float32))
+
+
+def test_context_reads_the_panel(tmp_path):
+    panel = PricePanel.from_frame(DATA, path=str(tmp_path / "p.npy"))
+    context = Context(panel)
+    assert context.version == data_version(DATA)
+    assert np.shares_memory(context.latest_row("Close"), panel.values)
+
+    def run(data):
+        simulation = Simulation(data, 10000, Utkarsh_v1_short_base("x"), START, END, verbose=False)
+        simulation._portfolio.logging = False
+        simulation.run()
+        return simulation.result
+
+    assert np.array_equal(run(context).value, run(DATA).value)
+
+
+def test_sweep_over_a_panel_matches_a_frame(tmp_path):
+    panel = PricePanel.from_frame(DATA, path=str(tmp_path / "p.npy"))
+    grid = sweep_grid([Utkarsh_v1_short_base], [START, datetime.date(2000, 9, 1)], [END], [10000])
+
+    def rows(context):
+        return sweep(context, grid, workers=2).sort_values("start_date").reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(rows(panel), rows(DATA))
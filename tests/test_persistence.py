@@ -0,0 +1,113 @@
+import copyreg
+import datetime
+import gc
+import pickle
+import pytest
+from pytrade import context as context_module
+from pytrade.context import Context, register_context
+from pytrade.data import PriceStore, get_data
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.portfolio import Portfolio, Stock, DepositTransaction, StockTransaction, TransactionType
+
+DAY = datetime.date(2000, 3, 1)
+
+
+class LegacyPortfolio:
+    """Pickles as a Portfolio with the attributes of the original, whole-object .pkl format."""
+    def __init__(self, state):
+        self.state = state
+
+    def __reduce__(self):
+        return (copyreg._reconstructor, (Portfolio, object, None), self.state)
+
+
+def saved(name, data):
+    portfolio = Portfolio(name, data)
+    portfolio.logging = False
+    portfolio.deposit(1000, DAY)
+    portfolio.buy("T0000", 2, 100, DAY)
+    portfolio.save()
+    return portfolio
+
+
+def test_load_with_newer_prices_warns(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = synthetic_panel(tickers=3)
+    saved("p", data)
+
+    newer = synthetic_panel(tickers=3, years=1.1)
+    with pytest.warns(UserWarning, match="saved with data version"):
+        portfolio = Portfolio.load("p", newer)
+    assert portfolio.context.data is newer
+    assert portfolio.current_value() == round(900 + 2 * newer["Adj Close"]["T0000"].iloc[-1], 3)
+
+
+def test_lazy_reattach_needs_a_live_data_set(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = synthetic_panel(tickers=3)
+    saved("p", data)
+
+    assert Portfolio.load("p").context.data is data
+    del data
+    gc.collect()
+    with pytest.raises(ValueError, match="is not loaded"):
+        Portfolio.load("p").context
+
+
+def test_pickling_does_not_register():
+    data = synthetic_panel(tickers=3)
+    portfolio = Portfolio("p", data)
+    version = portfolio.context.version
+    context_module.unregister_context(version)
+
+    loaded = pickle.loads(pickle.dumps(portfolio))
+    assert version not in context_module._contexts
+    assert loaded.data_version == version
+
+    register_context(data)
+    assert loaded.context.data is data
+
+
+def test_load_legacy_pickle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = synthetic_panel(tickers=3)
+    state = {
+        "name": "legacy",
+        "buy_power": 900,
+        "stocks": [Stock("T0000", 2, 100)],
+        "context": data,
+        "autosave": False,
+        "logging": False,
+        "history": [DepositTransaction(DAY, TransactionType.DEPOSIT, 1000),
+                    StockTransaction(DAY, TransactionType.BUY, Stock("T0000", 2, 100))],
+    }
+    with open("legacy.pkl", "wb") as output:
+        pickle.dump(LegacyPortfolio(state), output, pickle.HIGHEST_PROTOCOL)
+
+    portfolio = Portfolio.load("legacy")
+    assert "context" not in portfolio.__dict__
+    assert isinstance(portfolio.context, Context) and portfolio.context.data.equals(data)
+    assert portfolio.current_value() == round(900 + 2 * data["Adj Close"]["T0000"].iloc[-1], 3)
+    assert len(portfolio.history) == 2
+    assert portfolio.get_numshares("T0000") == 2
+
+    newer = synthetic_panel(tickers=3, years=1.1)
+    assert Portfolio.load("legacy", newer).context.data is newer
+
+
+def test_get_data_registers_the_loaded_frame(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = PriceStore("store")
+    store.append(synthetic_panel(tickers=3))
+    data = get_data(reload=False, store=store)
+    portfolio = saved("p", data)
+    value = portfolio.current_value()
+
+    # As in a new process: nothing registered until the data is loaded again
+    context_module.unregister_context(portfolio.context.version)
+    del data, portfolio
+    gc.collect()
+    data = get_data(reload=False, store="store")
+    loaded = Portfolio.load("p")
+    assert loaded.context.data is data
+    assert loaded.current_value() == value
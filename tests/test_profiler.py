@@ -0,0 +1,28 @@
+import datetime
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.portfolio import Portfolio
+from pytrade.profiler import Profiler
+from pytrade.simulation import Simulation
+from pytrade.strategy.current_strategies import Utkarsh_v1_short_base
+
+
+def test_profiled_keeps_the_method_metadata():
+    assert Portfolio.save.__name__ == "save"
+    assert Portfolio.save.__doc__ == Portfolio.save.__wrapped__.__doc__
+    assert Simulation.initialize.__qualname__ == "Simulation.initialize"
+
+
+def test_profiler_is_detached_after_the_run():
+    profiler = Profiler()
+    strategy = Utkarsh_v1_short_base("x")
+    simulation = Simulation(synthetic_panel(tickers=5, years=1), 10000, strategy, datetime.date(2000, 6, 1),
+                            datetime.date(2000, 9, 1), verbose=False, profiler=profiler)
+    simulation._portfolio.logging = False
+    portfolio = simulation.run()
+
+    assert profiler.stats["Simulation._step"][0] == len(simulation.result)
+    assert "Portfolio.buy" in profiler.stats
+    assert strategy.profiler is None and portfolio.profiler is None
+    calls = dict(profiler.stats)
+    portfolio.deposit(10, datetime.date(2000, 9, 1))
+    assert profiler.stats == calls
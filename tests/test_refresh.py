@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from pytrade.data import PriceStore, LocalFetcher, get_data, refresh, synthetic_panel
+
+PANEL = synthetic_panel(tickers=8, years=2)
+TICKERS = list(PANEL["Adj Close"].columns)
+
+
+def stored(store):
+    loaded = PriceStore(store.path).load()
+    return loaded, PANEL.loc[loaded.index, loaded.columns]
+
+
+def test_refresh_fetches_only_new_dates(tmp_path):
+    store = PriceStore(str(tmp_path / "store"))
+    first = LocalFetcher(PANEL.iloc[:300])
+    refresh(store, first, TICKERS, period="max", chunk_size=3, workers=2)
+    assert all(start is None for _, start, _, _ in first.calls)
+    assert store.last_date() == PANEL.index[299]
+
+    second = LocalFetcher(PANEL)
+    assert refresh(store, second, TICKERS, period="max", chunk_size=3, workers=2) > 0
+    assert {start for _, start, _, _ in second.calls} == {PANEL.index[299] + pd.Timedelta(days=1)}
+
+    loaded, expected = stored(store)
+    assert len(loaded) == len(PANEL)
+    assert np.array_equal(loaded.to_numpy(), expected.to_numpy())
+
+
+def test_refresh_backfills_new_tickers(tmp_path):
+    store = PriceStore(str(tmp_path / "store"))
+    refresh(store, LocalFetcher(PANEL.iloc[:300]), TICKERS[:4], period="max", chunk_size=2)
+
+    fetcher = LocalFetcher(PANEL)
+    refresh(store, fetcher, TICKERS, period="max", chunk_size=2)
+    backfills = [tickers for tickers, start, _, _ in fetcher.calls if start is None]
+    assert sorted(t for tickers in backfills for t in tickers) == sorted(TICKERS[4:])
+    assert set(store.last_dates().values()) == {PANEL.index[-1]}
+
+    loaded, expected = stored(store)
+    assert np.array_equal(loaded.to_numpy(), expected.to_numpy())
+
+
+def test_refresh_with_stored_end_fetches_nothing(tmp_path):
+    store = PriceStore(str(tmp_path / "store"))
+    refresh(store, LocalFetcher(PANEL), TICKERS, period="max", chunk_size=3)
+    segments = len(store.manifest["segments"])
+
+    fetcher = LocalFetcher(PANEL)
+    assert refresh(store, fetcher, TICKERS, period="max", end=PANEL.index[-1], chunk_size=3) == 0
+    assert fetcher.calls == []
+    assert len(store.manifest["segments"]) == segments
+
+
+def test_reload_tops_up_the_legacy_pickle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    PANEL.iloc[:300].to_pickle("latest.pkl")
+    with open("ticker.csv", "w") as output:
+        output.write(",".join(TICKERS))
+
+    fetcher = LocalFetcher(PANEL)
+    data = get_data(period="max", reload=True, store="store", fetcher=fetcher)
+    # The pickle is migrated first, so only the dates after it are fetched
+    assert {start for _, start, _, _ in fetcher.calls} == {PANEL.index[299] + pd.Timedelta(days=1)}
+    assert np.array_equal(data.to_numpy(), PANEL.loc[data.index, data.columns].to_numpy())
+    assert len(data) == len(PANEL)
@@ -0,0 +1,63 @@
+import datetime
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.portfolio import TransactionType
+from pytrade.simulation import Simulation, SimulationResult
+from pytrade.strategy.current_strategies import Utkarsh_v1_short_base
+
+DATA = synthetic_panel(tickers=10, years=2)
+
+
+def test_equity_curve_matches_replayed_history():
+    simulation = Simulation(DATA, 10000, Utkarsh_v1_short_base("x"), datetime.date(2000, 6, 1),
+                            datetime.date(2001, 3, 1), verbose=False)
+    simulation._portfolio.logging = False
+    portfolio = simulation.run()
+    result = simulation.result
+
+    # Value every day from the transactions made up to it
+    shares = defaultdict(float)
+    cash = 0.0
+    transactions = list(portfolio.history)
+    i = 0
+    prices = DATA["Adj Close"]
+    for day, value, day_cash, benchmark in zip(result.dates, result.value, result.cash, result.benchmark):
+        while i < len(transactions) and pd.Timestamp(transactions[i].date) <= day:
+            t = transactions[i]
+            if t.type == TransactionType.DEPOSIT:
+                cash += t.value
+            elif t.type == TransactionType.BUY:
+                shares[t.stock.ticker] += t.stock.num_shares
+                cash -= t.stock.num_shares * t.stock.avg_cost
+            elif t.type == TransactionType.SELL:
+                shares[t.stock.ticker] -= t.stock.num_shares
+                cash += t.stock.num_shares * t.stock.avg_cost
+            i += 1
+        invested = sum(n * prices.at[day, ticker] for ticker, n in shares.items() if abs(n) > 1e-9)
+        assert np.isclose(day_cash, cash)
+        assert np.isclose(value, cash + invested)
+        assert np.isclose(benchmark, 10000 / prices.at[result.dates[0], "^GSPC"] * prices.at[day, "^GSPC"])
+    assert i == len(transactions)
+    assert result.value[-1] == portfolio.current_value()
+    assert result.transactions == sum(1 for t in transactions if t.type in (TransactionType.BUY, TransactionType.SELL))
+
+
+def test_statistics_hand_computed(tmp_path):
+    dates = pd.bdate_range("2020-01-06", periods=6)
+    value = np.array([100, 110, 99, 104.5, 121, 110])
+    result = SimulationResult("r", dates, value, value / 2, value / 2, np.full(6, 100.0), 4)
+
+    assert np.allclose(result.returns(), [0.1, -0.1, 5.5 / 99, 16.5 / 104.5, -1 / 11])
+    assert np.allclose(result.drawdown(), [0, 0, -0.1, -0.05, 0, -1 / 11])
+    assert np.isclose(result.max_drawdown(), -0.1)
+    assert result.time_under_water() == 2
+    assert np.isclose(result.total_return(), 0.1)
+    returns = result.returns()
+    assert np.isclose(result.sharpe(), returns.mean() / returns.std(ddof=1) * np.sqrt(252))
+
+    result.save(str(tmp_path / "r.npz"))
+    loaded = SimulationResult.load(str(tmp_path / "r.npz"))
+    assert loaded.summary() == result.summary()
+    assert loaded.dates.equals(result.dates)
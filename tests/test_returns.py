@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from pytrade.portfolio import rate_of_return
+
+
+def problems(count, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        flows = rng.integers(1, 8)
+        amounts = rng.uniform(100, 5000, flows)
+        years = np.sort(rng.uniform(0.05, 10, flows))[::-1]
+        growth = rng.uniform(0.7, 1.4)
+        yield amounts, years, float((amounts * growth ** years).sum() * rng.uniform(0.98, 1.02))
+
+
+def test_single_deposit_closed_form():
+    assert np.isclose(rate_of_return([1000], [2], 1210), 1.1, rtol=1e-12)
+    assert np.isclose(rate_of_return([1000], [0.5], 900), 0.81, rtol=1e-12)
+    assert np.isnan(rate_of_return([0.0], [1], 100))
+
+
+def test_matches_fsolve():
+    opt = pytest.importorskip("scipy.optimize")
+    for amounts, years, value in problems(200):
+        expected = opt.fsolve(lambda rate: (amounts * rate ** years).sum() - value, 1, xtol=1e-13)[0]
+        assert np.isclose(rate_of_return(amounts, years, value), expected, rtol=1e-9)
+
+
+def test_batch_matches_single_solves():
+    rows = list(problems(50, seed=1))
+    width = max(len(amounts) for amounts, _, _ in rows)
+    amounts = np.zeros((len(rows), width))
+    years = np.zeros((len(rows), width))
+    for i, (a, y, _) in enumerate(rows):
+        amounts[i, :len(a)] = a
+        years[i, :len(y)] = y
+    batch = rate_of_return(amounts, years, [value for _, _, value in rows])
+    assert np.allclose(batch, [rate_of_return(a, y, value) for a, y, value in rows], rtol=1e-12)
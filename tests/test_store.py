@@ -0,0 +1,54 @@
+import os
+import numpy as np
+from pytrade.data import PriceStore, synthetic_panel
+
+
+def files(path):
+    return sum(len(names) for _, _, names in os.walk(path))
+
+
+def test_append_load_round_trip(tmp_path):
+    panel = synthetic_panel(tickers=4, years=2)
+    store = PriceStore(str(tmp_path / "store"))
+    store.append(panel.iloc[:300])
+    store.append(panel.iloc[300:])
+
+    loaded = PriceStore(str(tmp_path / "store")).load()
+    assert loaded.equals(panel[loaded.columns].rename_axis("Date"))
+
+    part = store.load(fields=["Close"], tickers=["T0002", "^GSPC"], start=panel.index[100], end=panel.index[199])
+    assert list(part.columns) == [("Close", "T0002"), ("Close", "^GSPC")]
+    assert np.array_equal(part.to_numpy(), panel.loc[panel.index[100]:panel.index[199], part.columns].to_numpy())
+
+
+def test_compact_merges_partitions_and_keeps_newest_values(tmp_path):
+    panel = synthetic_panel(tickers=4, years=2)
+    store = PriceStore(str(tmp_path / "store"))
+    for first in range(0, len(panel), 50):
+        store.append(panel.iloc[first:first + 50])
+    revised = panel.iloc[40:60] * 2
+    store.append(revised)
+    before = store.load()
+    segments = len(store.manifest["segments"])
+    assert segments > 10
+
+    assert store.compact() == segments - 2
+    assert sorted(s["partition"] for s in store.manifest["segments"]) == ["2000", "2001"]
+    assert files(str(tmp_path / "store")) == 1 + 2 * 3
+    after = PriceStore(str(tmp_path / "store")).load()
+    assert after.equals(before)
+    assert np.array_equal(after.loc[revised.index, revised.columns].to_numpy(), revised.to_numpy())
+
+
+def test_replace_drops_old_data(tmp_path):
+    panel = synthetic_panel(tickers=4, years=1)
+    store = PriceStore(str(tmp_path / "store"))
+    store.append(panel)
+    store.append(panel)
+
+    newer = synthetic_panel(tickers=3, years=1, seed=1)
+    store.replace(newer)
+    assert len(store.manifest["segments"]) == 1
+    assert store.tickers == list(newer["Adj Close"].columns)
+    loaded = PriceStore(str(tmp_path / "store")).load()
+    assert np.array_equal(loaded.to_numpy(), newer[loaded.columns].to_numpy())
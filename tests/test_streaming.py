@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from pytrade.cube import AnalysisCube
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.extrema import RollingExtrema
+from pytrade.streaming import StreamingAnalysis, StreamingEngine, replay
+
+DATA = synthetic_panel(tickers=6, years=3)
+ADJ_CLOSE = DATA["Adj Close"]
+PAIRS = [("three_wk", "one_yr"), ("three_m", "one_yr")]
+
+
+def assert_same(streamed, batch):
+    assert list(streamed.columns) == list(batch.columns)
+    assert streamed.index.equals(batch.index)
+    assert np.allclose(streamed.to_numpy(), batch.to_numpy(), rtol=1e-12, atol=0, equal_nan=True)
+
+
+def test_streaming_matches_batch_analysis():
+    extrema = RollingExtrema(ADJ_CLOSE)
+    cubes = {pair: AnalysisCube(extrema, *pair) for pair in PAIRS}
+    state = StreamingAnalysis(ADJ_CLOSE.columns, PAIRS)
+    # Three years of bars compact the buffer several times
+    for row, (date, prices) in enumerate(replay(DATA)):
+        frames = state.update(date, prices)
+        if row % 7 == 0 or row == len(DATA) - 1:
+            for pair in PAIRS:
+                assert_same(frames[pair], cubes[pair].frame(date, row=row))
+    assert len(state) <= 366
+
+
+def test_warm_up_matches_streaming_from_the_start():
+    split = 500
+    streamed = StreamingAnalysis(ADJ_CLOSE.columns, PAIRS)
+    for date, prices in replay(DATA.iloc[:split]):
+        streamed.push(date, prices)
+    warmed = StreamingAnalysis(ADJ_CLOSE.columns, PAIRS)
+    warmed.warm_up(ADJ_CLOSE.iloc[:split])
+
+    for date, prices in replay(DATA.iloc[split:split + 30]):
+        a, b = streamed.update(date, prices), warmed.update(date, prices.to_dict())
+        for pair in PAIRS:
+            assert_same(a[pair], b[pair])
+
+
+def test_engine_buys_the_top_batch_metrics():
+    extrema = RollingExtrema(ADJ_CLOSE)
+    cube = AnalysisCube(extrema, *PAIRS[0])
+    engine = StreamingEngine(ADJ_CLOSE.columns, PAIRS[:1], top=2)
+    for row, signals in enumerate(engine.run(replay(DATA))):
+        if row >= 400 and row % 50 == 0:
+            batch = cube.frame(DATA.index[row], row=row)["metric"].sort_values(ascending=False)
+            assert signals[0].buy == list(batch.index[:2])
@@ -0,0 +1,49 @@
+import datetime
+import numpy as np
+import pandas as pd
+from pytrade.data.synthetic import synthetic_panel
+from pytrade.simulation import Simulation, VectorizedBacktest
+from pytrade.strategy.current_strategies import Utkarsh_v1_short_base
+
+DATES = pd.bdate_range("2020-01-06", periods=4)
+PRICES = pd.DataFrame({("Adj Close", "A"): [10.0, 11.0, 12.0, 9.0], ("Adj Close", "B"): [20.0, 20.0, 25.0, 25.0]},
+                      index=DATES)
+
+
+def backtest():
+    return VectorizedBacktest(PRICES, 1000, DATES[0], DATES[-1])
+
+
+def test_run_trades_hand_computed():
+    trades = pd.DataFrame({"A": [50.0, 0, 0, -50], "B": [0.0, 0, 10, 0]}, index=DATES)
+    result = backtest().run_trades(trades)
+
+    # Holdings A 50, 50, 50, 0 and B 0, 0, 10, 10
+    assert np.allclose(result["cash"], [500, 500, 250, 700])
+    assert np.allclose(result["invested"], [500, 550, 850, 250])
+    assert np.allclose(result["value"], [1000, 1050, 1100, 950])
+    assert np.allclose(result["turnover"], [0.5, 0, 250 / 1100, 450 / 950])
+
+
+def test_run_weights_hand_computed():
+    weights = pd.DataFrame({"A": [0.5, np.nan, 1.0, np.nan], "B": [0.5, np.nan, 0.0, np.nan]}, index=DATES)
+    bt = backtest()
+    result = bt.run_weights(weights)
+
+    # 50 A and 25 B until the second rebalance, worth 1225, then 1225 / 12 shares of A
+    assert np.allclose(bt.holdings["A"], [50, 50, 1225 / 12, 1225 / 12])
+    assert np.allclose(bt.holdings["B"], [25, 25, 0, 0])
+    assert np.allclose(result["value"], [1000, 1050, 1225, 1225 / 12 * 9])
+    assert np.allclose(result["cash"], 0)
+    assert np.allclose(result["turnover"], [1, 0, (1225 / 12 - 50) * 12 / 1225 + 25 * 25 / 1225, 0])
+
+
+def test_replay_strategy_matches_event_loop():
+    data = synthetic_panel(tickers=10, years=2)
+    start, end = datetime.date(2000, 6, 1), datetime.date(2001, 3, 1)
+    simulation = Simulation(data, 10000, Utkarsh_v1_short_base("x"), start, end, verbose=False)
+    simulation._portfolio.logging = False
+    simulation.run()
+
+    replayed = VectorizedBacktest(data, 10000, start, end).replay_strategy(Utkarsh_v1_short_base("y"))
+    assert np.allclose(replayed["value"].to_numpy(), simulation.result.value)